@@ -1,4 +1,6 @@
 import csv
+from functools import lru_cache
+
 import numpy as np
 from bitarray import bitarray
 from openpyxl import Workbook
@@ -14,12 +16,124 @@ from model.enlazador.enlazador import Enlazador
 
 from model.procesador import bus
 from model.procesador.bus import DataBus, DirectionBus, ControlBus
-
+from controller import terminal as _term
 
 # -----------------------
 # Public Global Variables
 # -----------------------
 
+# -----------------------
+# Nombres de registros
+# -----------------------
+
+# Índice -> nombre legible (PC, SP, IR, ESTADO, R4, ..., R31)
+_REG_NAMES: tuple = ("PC", "SP", "IR", "ESTADO") + tuple(f"R{i}" for i in range(4, 32))
+
+# -----------------------
+# Modos de representación
+# -----------------------
+
+_MODES: tuple = ("bin", "hex", "decimal", "decimalc2")
+_VALID_MODES: frozenset = frozenset(_MODES)
+
+
+def _fmt_bitarray_bin(word_bit: bitarray) -> str:
+    return word_bit.to01()
+
+
+def _fmt_bitarray_hex(word_bit: bitarray) -> str:
+    return hex(NC.bitarray2natural(word_bit))
+
+
+def _fmt_bitarray_decimal(word_bit: bitarray) -> str:
+    return str(NC.bitarray2natural(word_bit))
+
+
+def _fmt_bitarray_decimalc2(word_bit: bitarray) -> str:
+    return str(NC.bitarray2int(word_bit))
+
+
+# Modo -> función que formatea una palabra (bitarray) de registro o bus
+_FMT_BITARRAY: dict = {
+    "bin": _fmt_bitarray_bin,
+    "hex": _fmt_bitarray_hex,
+    "decimal": _fmt_bitarray_decimal,
+    "decimalc2": _fmt_bitarray_decimalc2,
+}
+
+def _fmt_memory_bin(val: np.uint64) -> str:
+    return format(val, '064b')
+
+
+def _fmt_memory_hex(val: np.uint64) -> str:
+    return hex(val)
+
+
+def _fmt_memory_decimal(val: np.uint64) -> str:
+    return str(val)
+
+
+def _fmt_memory_decimalc2(val: np.uint64) -> str:
+    v = int(val)
+    if v >> (constants.WORDS_SIZE_BITS - 1):
+        v -= 1 << constants.WORDS_SIZE_BITS
+    return str(v)
+
+
+# Modo -> función que formatea una celda de memoria (uint64)
+_MODE_FUNCS: dict = {
+    "bin": _fmt_memory_bin,
+    "hex": _fmt_memory_hex,
+    "decimal": _fmt_memory_decimal,
+    "decimalc2": _fmt_memory_decimalc2,
+}
+
+# -----------------------
+# Formato vectorizado de memoria
+# -----------------------
+
+# Fila i: los 8 caracteres ASCII ('0'/'1') del byte i en binario
+_BIN_BYTE_LUT: np.ndarray = np.array(
+    [list(format(b, '08b').encode('ascii')) for b in range(256)],
+    dtype=np.uint8
+)
+# Tamaño aproximado (bytes) de cada escritura al volcar la memoria
+_SAVE_CHUNK_BYTES: int = 1 << 20
+# Longitud máxima de una línea del CSV (incluye '\n') por modo
+_SAVE_LINE_BYTES: dict[str, int] = {
+    "bin": 65,
+    "hex": 19,
+    "decimal": 21,
+    "decimalc2": 21,
+}
+
+
+def _memory_block_to_bytes(block: np.ndarray, mode: str) -> bytes:
+    """
+    Convierte un bloque de palabras uint64 en las líneas del CSV
+    (una palabra por línea) operando sobre todo el array a la vez.
+    :param block: array uint64 con las palabras a formatear
+    :param mode: ["bin", "hex", "decimal", "decimalc2"]
+    :return: bytes ASCII listos para escribir
+    """
+    if mode == "bin":
+        # Bytes big-endian de cada palabra -> 8 caracteres por byte
+        be_bytes = block.astype('>u8').view(np.uint8).reshape(-1, 8)
+        lines = np.empty((len(block), 65), dtype=np.uint8)
+        lines[:, :64] = _BIN_BYTE_LUT[be_bytes].reshape(-1, 64)
+        lines[:, 64] = ord('\n')
+        return lines.tobytes()
+    if mode == "hex":
+        text = np.char.add("0x", np.char.mod('%x', block))
+    elif mode == "decimal":
+        text = np.char.mod('%d', block)
+    elif mode == "decimalc2":
+        text = np.char.mod('%d', block.view(np.int64))
+    else:
+        raise ValueError("Modo no válido.")
+    return ('\n'.join(text.tolist()) + '\n').encode('ascii')
+
+
 # -----------------------
 # Funciones de acción
 # -----------------------
@@ -42,10 +156,10 @@ class Action:
         CPU.refresh()
         CPU.ALU.set_up()
         Memory.set_up()
+        Action._format_instruction_cached.cache_clear()
 
         # Register terminal input callback to resume execution when input arrives
         try:
-            from controller import terminal as _term
             _term.register_input_callback(Action._on_input_available)
         except Exception:
             pass
@@ -76,51 +190,53 @@ class Action:
     @staticmethod
     def _reg_name(reg_num: int) -> str:
         """Return human readable register name for a register number."""
-        if reg_num == 0:
-            return "PC"
-        if reg_num == 1:
-            return "SP"
-        if reg_num == 2:
-            return "IR"
-        if reg_num == 3:
-            return "ESTADO"
+        if 0 <= reg_num < 32:
+            return _REG_NAMES[reg_num]
         return f"R{reg_num}"
 
     @staticmethod
     def _format_instruction(instr_asm: str, instr_args: list, opcode_len: str) -> str:
-        """Build a readable instruction string with operands from CU.instruction_args."""
+        """Build a readable instruction string with operands from CU.instruction_args.
+        Operands are converted to ints here so the string itself can be memoized."""
         if instr_asm is None:
             return None
 
         try:
-            if opcode_len == "64":
-                return instr_asm
-            if opcode_len == "54":
-                r = NC.bitarray2natural(instr_args[1])
-                r_p = NC.bitarray2natural(instr_args[2])
-                return f"{instr_asm} {Action._reg_name(r)}, {Action._reg_name(r_p)}"
-            if opcode_len == "59":
-                r = NC.bitarray2natural(instr_args[1])
-                return f"{instr_asm} {Action._reg_name(r)}"
-            if opcode_len == "35":
-                r = NC.bitarray2natural(instr_args[1])
-                m = NC.bitarray2natural(instr_args[2])
-                # Some 35-bit-format instructions (e.g. GUARD) use the R field as unused (0)
-                # and semantically operate over a memory operand only. Mostrar M[...] en ese caso
-                if instr_asm is not None and instr_asm.upper() == 'GUARD' and r == 0:
-                    return f"{instr_asm} M[{m}]"
-                return f"{instr_asm} {Action._reg_name(r)}, {m}"
-            if opcode_len == "27":
+            r, r2, v = 0, 0, 0
+            if opcode_len in ("54", "59", "35", "27"):
                 r = NC.bitarray2natural(instr_args[1])
+            if opcode_len in ("54", "35"):
+                r2 = NC.bitarray2natural(instr_args[2])
+            elif opcode_len == "27":
                 v = NC.bitarray2int(instr_args[2])
-                return f"{instr_asm} {Action._reg_name(r)}, {v}"
-            if opcode_len == "40":
-                m = NC.bitarray2natural(instr_args[1])
-                return f"{instr_asm} {m}"
+            elif opcode_len == "40":
+                v = NC.bitarray2natural(instr_args[1])
         except Exception:
             # Fallback to just the asm name
             return instr_asm
+        return Action._format_instruction_cached(instr_asm, opcode_len, r, r2, v)
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _format_instruction_cached(instr_asm: str, opcode_len: str, r: int, r2: int, v: int) -> str:
+        """Formatted instruction for already-decoded operands (r, r2: registers
+        or memory address, v: immediate or jump address)."""
+        if opcode_len == "64":
+            return instr_asm
+        if opcode_len == "54":
+            return f"{instr_asm} {Action._reg_name(r)}, {Action._reg_name(r2)}"
+        if opcode_len == "59":
+            return f"{instr_asm} {Action._reg_name(r)}"
+        if opcode_len == "35":
+            # Some 35-bit-format instructions (e.g. GUARD) use the R field as unused (0)
+            # and semantically operate over a memory operand only. Mostrar M[...] en ese caso
+            if instr_asm.upper() == 'GUARD' and r == 0:
+                return f"{instr_asm} M[{r2}]"
+            return f"{instr_asm} {Action._reg_name(r)}, {r2}"
+        if opcode_len == "27":
+            return f"{instr_asm} {Action._reg_name(r)}, {v}"
+        if opcode_len == "40":
+            return f"{instr_asm} {v}"
 
     @staticmethod
     def step() -> None:
@@ -185,11 +301,10 @@ class Action:
         Si en el front se seleccionó, "Guardar Memoria" o "Guardar Registros",
         entonces los parámetros deben ser True respectivamente.
         """
-        valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-        if mode not in valid_modes:
+        if mode not in _VALID_MODES:
             raise ValueError(
                 f"Modo inválido: '{mode}'. "
-                f"Opciones válidas: {valid_modes}")
+                f"Opciones válidas: {list(_MODES)}")
 
         # Guardar memoria si requerido en .csv
         if save_memory:
@@ -279,43 +394,28 @@ class Action:
         # Poner CPU en ejecución
         CPU.EN_EJECUCION = True
 
+        # Referencias locales para el ciclo caliente
+        fetch, decode, execute = CPU.fetch, CPU.decode, CPU.execute
+        _InputNeeded = _term.InputNeeded
+
         # Ciclo Fetch-Decode-Execute
+        # If an instruction needs input, block until it arrives and retry
+        # execute() on the same instruction (no new fetch/decode).
+        needs_fetch = True
         try:
             while not CPU.PARA_INSTRUCTION:
-                CPU.fetch()
-                CPU.decode()
-                CPU.execute()
-        except Exception as e:
-            # If execution requests input, wait here until input is available
-            try:
-                from controller import terminal as _term
-                if isinstance(e, _term.InputNeeded):
-                    # Block until input is available, then finish the instruction
-                    import time
-                    while not _term.has_input():
-                        time.sleep(0.05)
-                    # Now attempt to complete the instruction
-                    CPU.execute()
-                    # Continue execution loop
-                    while not CPU.PARA_INSTRUCTION:
-                        CPU.fetch()
-                        CPU.decode()
-                        try:
-                            CPU.execute()
-                        except Exception as e2:
-                            if isinstance(e2, _term.InputNeeded):
-                                # wait again
-                                while not _term.has_input():
-                                    time.sleep(0.05)
-                                CPU.execute()
-                                continue
-                            else:
-                                raise
-                    # finished normally
-                    pass
-            except Exception:
-                # If it's not InputNeeded or something else failed, re-raise
-                raise
+                try:
+                    if needs_fetch:
+                        fetch()
+                        decode()
+                        needs_fetch = False
+                    execute()
+                    needs_fetch = True
+                except _InputNeeded:
+                    _term.wait_for_input()
+        except Exception:
+            # Any other error stops the program
+            pass
 
         # Refrescar la CPU:
         #   Ejecución e instrucción de parada en Falso
@@ -326,14 +426,15 @@ class Action:
         """Called when terminal input is pushed. If execution was paused waiting
         for input, resume the interrupted instruction and continue execution."""
         try:
-            from controller import terminal as _term
             if not Action._waiting_for_input:
                 return
+            fetch, decode, execute = CPU.fetch, CPU.decode, CPU.execute
+            _InputNeeded = _term.InputNeeded
             # Attempt to finish the current instruction
             try:
-                CPU.execute()
+                execute()
             except Exception as e:
-                if isinstance(e, _term.InputNeeded):
+                if isinstance(e, _InputNeeded):
                     # Still no input; remain waiting
                     Action._waiting_for_input = True
                     return
@@ -343,12 +444,12 @@ class Action:
             # Instruction finished; resume normal execution loop
             Action._waiting_for_input = False
             while not CPU.PARA_INSTRUCTION:
-                CPU.fetch()
-                CPU.decode()
+                fetch()
+                decode()
                 try:
-                    CPU.execute()
+                    execute()
                 except Exception as e:
-                    if isinstance(e, _term.InputNeeded):
+                    if isinstance(e, _InputNeeded):
                         Action._waiting_for_input = True
                         return
                     else:
@@ -374,16 +475,10 @@ class Data:
             :param mode: ["bin", "hex", "decimal", "decimalc2"]
             :return:
             """
-            if mode == "bin":
-                return format(val, '064b')
-            elif mode == "hex":
-                return hex(val)
-            elif mode == "decimal":
-                return str(val)
-            elif mode == "decimalc2":
-                return str(NC.bitarray2int(NC.natural2bitarray(int(val))))
-            else:
+            fmt = _MODE_FUNCS.get(mode)
+            if fmt is None:
                 raise ValueError("Modo no válido.")
+            return fmt(val)
 
         @staticmethod
         def save_memory_fast(path_csv: str, mode: str) -> None:
@@ -392,10 +487,17 @@ class Data:
             :param path_csv
             :param mode: ('bin', 'hex', 'decimal', 'decimalc2').
             """
+            if mode not in _VALID_MODES:
+                raise ValueError("Modo no válido.")
+
             mem_array: np.ndarray = Memory.array
-            with open(path_csv, "w", encoding="utf-8") as f:
-                for val in mem_array:
-                    f.write(Data.Memory_D.format_memory_value(val, mode) + '\n')
+            # Bloques de ~1 MB de salida para acotar la memoria usada
+            chunk_cells: int = _SAVE_CHUNK_BYTES // _SAVE_LINE_BYTES[mode]
+            # Salida solo ASCII: se escriben bytes directamente (sin TextIOWrapper)
+            with open(path_csv, "wb") as f:
+                for start in range(0, len(mem_array), chunk_cells):
+                    block = mem_array[start:start + chunk_cells]
+                    f.write(_memory_block_to_bytes(block, mode))
 
         @staticmethod
         def save_modified_memory(path_xlsx: str, mode: str) -> None:
@@ -429,12 +531,19 @@ class Data:
             :param mode: Modo de representación ('bin', 'hex', 'decimal', 'decimalc2').
             :return: Cadena representando la palabra en el formato especificado.
             """
-            valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-            if mode not in valid_modes:
-                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {valid_modes}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
+
+            return Data.Memory_D._get_memory_content_unchecked(address, mode)
 
+        @staticmethod
+        def _get_memory_content_unchecked(address: int, mode: str) -> str:
+            """
+            Igual que get_memory_content pero sin validar el modo
+            (el llamador ya lo validó).
+            """
             word_64: np.uint64 = Memory.read(address)
-            return Data.Memory_D.format_memory_value(word_64, mode)
+            return _MODE_FUNCS[mode](word_64)
 
         @staticmethod
         def get_memory_range_content(start: int, end: int, mode: str) -> list[str]:
@@ -457,8 +566,13 @@ class Data:
                 raise ValueError(
                     f"Del rango {end} inválido. "
                     f"Debe ser menor o igual a {constants.STACK_RANGE[1]}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
 
-            return [Data.Memory_D.get_memory_content(addr, mode) for addr in range(start, end + 1)]
+            # Se lee celda a celda: Memory.read consume la entrada en el rango de E/S
+            _read = Memory.read
+            _fmt = _MODE_FUNCS[mode]
+            return [_fmt(_read(addr)) for addr in range(start, end + 1)]
 
         @staticmethod
         def get_code_segment_content(mode: str) -> list[str]:
@@ -501,6 +615,9 @@ class Data:
             )
 
     class CPU_D:
+        # (reg_num, mode) -> (versión del registro, cadena formateada)
+        _reg_fmt_cache: dict[tuple[int, str], tuple[int, str]] = {}
+
         @staticmethod
         def get_register_content(reg_num: int, mode: str) -> str:
             """
@@ -514,20 +631,18 @@ class Data:
             :param mode: Modo de representación ('bin', 'hex', 'decimal', 'decimalc2').
             :return: Cadena representando la palabra en el formato especificado.
             """
-            valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-            if mode not in valid_modes:
-                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {valid_modes}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
 
-            word_bit: bitarray = CPU.ALU.read_register(reg_num)
+            version: int = CPU.ALU._reg_version[reg_num]
+            cached = Data.CPU_D._reg_fmt_cache.get((reg_num, mode))
+            if cached is not None and cached[0] == version:
+                return cached[1]
 
-            if mode == "bin":
-                return word_bit.to01()
-            elif mode == "hex":
-                return hex(NC.bitarray2natural(word_bit))
-            elif mode == "decimal":
-                return str(NC.bitarray2natural(word_bit))
-            elif mode == "decimalc2":
-                return str(NC.bitarray2int(word_bit))
+            word_bit: bitarray = CPU.ALU.read_register(reg_num)
+            text: str = _FMT_BITARRAY[mode](word_bit)
+            Data.CPU_D._reg_fmt_cache[(reg_num, mode)] = (version, text)
+            return text
 
         @staticmethod
         def get_registers_range_content(start: int, end: int, mode: str) -> list[str]:
@@ -549,7 +664,12 @@ class Data:
             if end > 31:
                 raise ValueError(f"Del rango {end} inválido. Debe ser menor o igual a 31")
 
-            return [Data.CPU_D.get_register_content(num, mode) for num in range(start, end + 1)]
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
+
+            # Formato vectorizado sobre la copia uint64 del banco de registros
+            block: np.ndarray = CPU.ALU._regs_u64[start:end + 1]
+            return _memory_block_to_bytes(block, mode).decode('ascii').split('\n')[:-1]
 
     class Bus_D:
 
@@ -561,20 +681,11 @@ class Data:
             :param mode: Modo de representación ('bin', 'hex', 'decimal', 'decimalc2').
             :return: Cadena representando la palabra en el formato especificado.
             """
-            valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-            if mode not in valid_modes:
-                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {valid_modes}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
 
             word_bit: bitarray = DataBus.read()
-
-            if mode == "bin":
-                return word_bit.to01()
-            elif mode == "hex":
-                return hex(NC.bitarray2natural(word_bit))
-            elif mode == "decimal":
-                return str(NC.bitarray2natural(word_bit))
-            elif mode == "decimalc2":
-                return str(NC.bitarray2int(word_bit))
+            return _FMT_BITARRAY[mode](word_bit)
 
         @staticmethod
         def get_directionbus(mode: str) -> str:
@@ -584,20 +695,11 @@ class Data:
             :param mode: Modo de representación ('bin', 'hex', 'decimal', 'decimalc2').
             :return: Cadena representando la palabra en el formato especificado.
             """
-            valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-            if mode not in valid_modes:
-                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {valid_modes}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
 
             word_bit: bitarray = DirectionBus.read()
-
-            if mode == "bin":
-                return word_bit.to01()
-            elif mode == "hex":
-                return hex(NC.bitarray2natural(word_bit))
-            elif mode == "decimal":
-                return str(NC.bitarray2natural(word_bit))
-            elif mode == "decimalc2":
-                return str(NC.bitarray2int(word_bit))
+            return _FMT_BITARRAY[mode](word_bit)
 
         @staticmethod
         def get_controlbus(mode: str) -> str:
@@ -607,17 +709,8 @@ class Data:
             :param mode: Modo de representación ('bin', 'hex', 'decimal', 'decimalc2').
             :return: Cadena representando la palabra en el formato especificado.
             """
-            valid_modes = ["bin", "hex", "decimal", "decimalc2"]
-            if mode not in valid_modes:
-                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {valid_modes}")
+            if mode not in _VALID_MODES:
+                raise ValueError(f"Modo inválido: '{mode}'. Opciones válidas: {list(_MODES)}")
 
             word_bit: bitarray = ControlBus.read()
-
-            if mode == "bin":
-                return word_bit.to01()
-            elif mode == "hex":
-                return hex(NC.bitarray2natural(word_bit))
-            elif mode == "decimal":
-                return str(NC.bitarray2natural(word_bit))
-            elif mode == "decimalc2":
-                return str(NC.bitarray2int(word_bit))
+            return _FMT_BITARRAY[mode](word_bit)
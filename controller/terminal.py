@@ -3,18 +3,43 @@ The module provides a write callback for Memory.write notifications and
 an input queue for Memory.read to consume input provided by the GUI.
 """
 from typing import Callable, Optional
+import collections
+import struct
 import threading
 import time
 
 _write_callback: Optional[Callable[[int, str], None]] = None
-_input_queue: list[int] = []
+_input_queue: collections.deque[int] = collections.deque()
 _input_callbacks: list[Callable[[], None]] = []
+# Lock to protect the input queue; the event is set while it has data
+_input_lock = threading.Lock()
+_input_event = threading.Event()
 
-# Buffering for grouped writes: map address -> (accum_str, timer)
+# Buffering for grouped writes: map address -> {'acc': str, 'deadline': float}
 _write_buffers: dict[int, dict] = {}
-# Lock to protect buffers
+# Lock to protect buffers; the condition wakes the flush thread
 _buf_lock = threading.Lock()
+_flush_cond = threading.Condition(_buf_lock)
+_flush_thread: Optional[threading.Thread] = None
 _FLUSH_DELAY = 0.05  # seconds
+# Optional asyncio-style event loop that delivers buffered writes instead of
+# the flush thread (see register_event_loop)
+_event_loop = None
+
+# Zero padding and little-endian packer/unpacker for 8-byte words
+_PAD = b"\x00" * 8
+_U64 = struct.Struct('<Q')
+_u64_pack = _U64.pack
+_u64_unpack_from = _U64.unpack_from
+
+# Whole-word patterns recognised by write_notify (little-endian)
+_U64_MAX = 0xFFFFFFFFFFFFFFFF
+_NUMERIC_MARKER_MASK = 0xFF0000000000FFFF  # bytes 0, 1 and 7
+_NUMERIC_MARKER = 0x0200000000004EFF       # 0xFF 0x4E ... 0x02
+_NEWLINE_WORD = 0x010000000000000A         # \n 0 0 0 0 0 0 0x01
+
+# Printable bytes (32..126 plus tab, LF, CR); deleting them leaves b'' for text
+_PRINTABLE = bytes(range(32, 127)) + b"\t\n\r"
 
 # Flag to track if next value should be treated as number
 _next_is_number = False
@@ -25,6 +50,72 @@ class InputNeeded(Exception):
     pass
 
 
+def _flush_buffered(flushed: list[tuple[int, str]]):
+    """Deliver already popped (address, text) buffers to the write callback.
+    Must be called without holding _buf_lock."""
+    cb = _write_callback
+    if cb:
+        for a, acc_text in flushed:
+            try:
+                cb(a, acc_text)
+            except Exception:
+                pass
+
+
+def _flush_loop():
+    """Background loop that delivers each buffered write once its deadline
+    has passed, sleeping until the earliest pending deadline otherwise."""
+    while True:
+        with _flush_cond:
+            while True:
+                now = time.monotonic()
+                due = [a for a, e in _write_buffers.items() if e['deadline'] <= now]
+                if due:
+                    break
+                timeout = None
+                if _write_buffers:
+                    timeout = min(e['deadline'] for e in _write_buffers.values()) - now
+                _flush_cond.wait(timeout)
+            flushed = [(a, _write_buffers.pop(a)['acc']) for a in due]
+        # Invoke the callback outside the lock
+        _flush_buffered(flushed)
+
+
+def _ensure_flush_thread():
+    """Start the flush thread on first use. Must be called with _buf_lock held."""
+    global _flush_thread
+    if _flush_thread is None:
+        _flush_thread = threading.Thread(target=_flush_loop, name="terminal-flush", daemon=True)
+        _flush_thread.start()
+
+
+def _flush_on_loop(address: int):
+    """Event-loop counterpart of _flush_loop for a single address: deliver the
+    buffer if its deadline passed, otherwise re-arm for the remaining time."""
+    with _flush_cond:
+        entry = _write_buffers.get(address)
+        if entry is None:
+            return
+        remaining = entry['deadline'] - time.monotonic()
+        if remaining <= 0:
+            del _write_buffers[address]
+    loop = _event_loop
+    if remaining > 0:
+        if loop is not None:
+            loop.call_later(remaining, _flush_on_loop, address)
+        return
+    _flush_buffered([(address, entry['acc'])])
+
+
+def register_event_loop(loop):
+    """Deliver buffered writes on `loop` (an asyncio event loop) with
+    call_later instead of the background flush thread, so the write callback
+    runs on the loop's thread. Pass None to go back to the flush thread.
+    Register it before the program starts writing to E/S."""
+    global _event_loop
+    _event_loop = loop
+
+
 def register_write_callback(cb: Callable[[int, str], None]):
     """Register a function(cb(address:int, text:str)) to be called when
     a word is written into an E/S memory address.
@@ -33,119 +124,93 @@ def register_write_callback(cb: Callable[[int, str], None]):
     _write_callback = cb
 
 
-def write_notify(address: int, uint64_value: int):
+def write_notify(address: int, uint64_value: int,
+                 _pack=_u64_pack, _printable=_PRINTABLE, _buffers=_write_buffers,
+                 _cond=_flush_cond, _monotonic=time.monotonic, _delay=_FLUSH_DELAY):
     """Called by Memory when an E/S address is written. Decodes the 64-bit
-    value into a small UTF-8 string and calls the registered callback."""
-    global _write_callback, _next_is_number
+    value into a small UTF-8 string and calls the registered callback.
+    The underscore keyword arguments bind module globals as locals and are
+    not meant to be passed by callers."""
+    global _next_is_number
     # Heuristic: if the 64-bit word contains only printable ASCII bytes
     # (after stripping trailing zeros) then decode and show as text. Otherwise
     # display the numeric value (so programs that GUARD numbers print numbers).
-    try:
-        b = int(uint64_value).to_bytes(8, 'little')
-        bstripped = b.rstrip(b"\x00")
-        
-        # Check for numeric marker: 0xFF 0x4E 0x00 ... 0x02
-        if len(b) == 8 and b[0] == 0xFF and b[1] == 0x4E and b[7] == 2:
-            # Numeric marker detected - next value is a number
-            _next_is_number = True
-            return  # Don't display the marker itself
-        
-        # Check if previous value was a numeric marker
-        if _next_is_number:
-            # Force treat as number
-            text = str(int(uint64_value))
-            _next_is_number = False
-        # Special case: newline marker from print statements
-        # Pattern: \n\x00\x00\x00\x00\x00\x00\x01
-        elif len(b) == 8 and b[0] == 10 and b[7] == 1 and b[1:7] == b'\x00' * 6:
-            text = '\n'
-        # Special case 2: empty value
-        elif not bstripped:
-            text = ''
-        # Multi-byte values: likely text strings
-        elif len(bstripped) > 1:
-            # Check if all bytes are printable
-            is_printable = True
-            for ch in bstripped:
-                # Allow whitespace
-                if ch in (9, 10, 13):
-                    continue
-                if ch < 32 or ch > 126:
-                    is_printable = False
-                    break
-            
-            if is_printable:
-                try:
-                    text = bstripped.decode('utf-8')
-                except Exception:
-                    text = str(int(uint64_value))
-            else:
-                text = str(int(uint64_value))
-        # Single byte value
+    # memory words are uint64; the mask keeps every path below total
+    v = int(uint64_value) & _U64_MAX
+
+    # Check for numeric marker: 0xFF 0x4E 0x00 ... 0x02
+    if (v & _NUMERIC_MARKER_MASK) == _NUMERIC_MARKER:
+        # Numeric marker detected - next value is a number
+        _next_is_number = True
+        return  # Don't display the marker itself
+
+    # Check if previous value was a numeric marker
+    if _next_is_number:
+        # Force treat as number
+        text = str(v)
+        _next_is_number = False
+    # Special case: newline marker from print statements
+    # Pattern: \n\x00\x00\x00\x00\x00\x00\x01
+    elif v == _NEWLINE_WORD:
+        text = '\n'
+    # Single printable ASCII character (space to ~)
+    elif 32 <= v <= 126:
+        # Treat as character (this includes ':', letters, punctuation)
+        text = chr(v)
+    # Special case 2: empty value
+    elif v == 0:
+        text = ''
+    # Non-printable single byte (0-31, 127-255): treat as number
+    # This catches the case of print(10) where 10 is the byte value
+    elif v < 256:
+        text = str(v)
+    # Multi-byte values: likely text strings
+    else:
+        # stripped length straight from the integer (no trailing-zero scan)
+        bstripped = _pack(v)[:(v.bit_length() + 7) >> 3]
+        # Check if all bytes are printable (whitespace allowed)
+        if not bstripped.translate(None, _printable):
+            # every byte is printable ASCII, so the decode cannot fail
+            text = bstripped.decode('ascii')
         else:
-            byte_val = bstripped[0]
-            # If it's a printable ASCII character (space to ~)
-            if 32 <= byte_val <= 126:
-                # Treat as character (this includes ':', letters, punctuation)
-                text = chr(byte_val)
-            else:
-                # Non-printable single byte (0-31, 127-255): treat as number
-                # This catches the case of print(10) where 10 is the byte value
-                text = str(int(uint64_value))
-    except Exception:
-        text = str(uint64_value)
+            text = str(v)
 
     # Buffer writes for a short time window so consecutive 8-byte chunks
     # produced by the compiler are concatenated into a single callback.
-    with _buf_lock:
-        entry = _write_buffers.get(address)
+    loop = _event_loop
+    with _cond:
+        deadline = _monotonic() + _delay
+        entry = _buffers.get(address)
         if entry is None:
-            # create new buffer entry
-            entry = {'acc': text, 'timer': None}
-            _write_buffers[address] = entry
+            # create new buffer entry and wake the flush thread, since this
+            # may now be the earliest deadline
+            _buffers[address] = {'acc': text, 'deadline': deadline}
+            if loop is None:
+                _ensure_flush_thread()
+                _cond.notify()
         else:
+            # postponing an existing deadline needs no wake-up: the flush
+            # thread re-checks the deadlines when its current wait expires
             entry['acc'] += text
-
-        # (re)start flush timer
-        def _flush(a=address):
-            try:
-                with _buf_lock:
-                    e = _write_buffers.pop(a, None)
-                if e is None:
-                    return
-                acc_text = e.get('acc', '')
-                if _write_callback:
-                    try:
-                        _write_callback(a, acc_text)
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-        # Cancel previous timer if any
-        tprev = entry.get('timer')
-        if tprev and isinstance(tprev, threading.Timer):
-            try:
-                tprev.cancel()
-            except Exception:
-                pass
-        # Start a new timer to flush after short delay
-        timer = threading.Timer(_FLUSH_DELAY, _flush)
-        entry['timer'] = timer
-        timer.daemon = True
-        timer.start()
+            entry['deadline'] = deadline
+            return
+    if loop is not None:
+        # write_notify runs on the CPU thread: hand the timer to the loop thread
+        loop.call_soon_threadsafe(loop.call_later, _delay, _flush_on_loop, address)
 
 
-def push_input(text: str):
+def push_input(text: str, _queue=_input_queue, _lock=_input_lock, _event=_input_event):
     """Push text into the input queue. Encodes to 64-bit integers (one per 8 bytes).
     For simplicity, we push only the first up-to-8-bytes chunk as one uint64.
     """
     if text is None:
         return
     val = encode_str_to_uint64(text)
-    _input_queue.append(val)
+    with _lock:
+        _queue.append(val)
+        _event.set()
     # Notify any registered input callbacks (resume handlers)
-    for cb in list(_input_callbacks):
+    for cb in tuple(_input_callbacks):
         try:
             cb()
         except Exception:
@@ -157,38 +222,53 @@ def register_input_callback(cb: Callable[[], None]):
     _input_callbacks.append(cb)
 
 
-def pop_input_uint64() -> int:
-    if _input_queue:
-        v = _input_queue.pop(0)
+def pop_input_uint64(_queue=_input_queue, _lock=_input_lock, _event=_input_event) -> int:
+    with _lock:
+        try:
+            v = _queue.popleft()
+        except IndexError:
+            return 0
+        if not _queue:
+            _event.clear()
         return v
-    return 0
+
+
+def wait_for_input(timeout: Optional[float] = None) -> bool:
+    """Block until the input queue has data (or timeout expires)."""
+    return _input_event.wait(timeout)
 
 
 def has_input() -> bool:
-    l = len(_input_queue) > 0
-    return l
+    return bool(_input_queue)
 
 
 def encode_str_to_uint64(s: str) -> int:
     # Try to parse as integer first (for numeric input)
-    try:
-        s_stripped = s.strip()
-        if s_stripped:
-            # Try decimal
-            num = int(s_stripped, 10)
-            return num
-    except ValueError:
-        pass
-    
+    s_stripped = s.strip()
+    if s_stripped:
+        core = s_stripped[1:] if s_stripped[0] in '+-' else s_stripped
+        # Only attempt int() when it can succeed, so text input does not
+        # pay for a ValueError ('_' digit separators are also accepted by int)
+        if core.isdecimal():
+            return int(s_stripped, 10)
+        if '_' in core:
+            try:
+                return int(s_stripped, 10)
+            except ValueError:
+                pass
+
     # Fallback: encode as UTF-8 string (for text input)
-    b = s.encode('utf-8')[:8]
-    b = b.ljust(8, b"\x00")
+    b = s.encode('utf-8')
+    if len(b) >= 8:
+        buf = b[:8]
+    else:
+        buf = b + _PAD[:8 - len(b)]
     # little-endian
-    return int.from_bytes(b, 'little')
+    return _u64_unpack_from(buf)[0]
 
 
 def decode_uint64_to_str(v: int) -> str:
-    b = int(v).to_bytes(8, 'little')
+    b = _u64_pack(int(v))
     # strip trailing zeros
     b = b.rstrip(b"\x00")
     try:
@@ -12,7 +12,7 @@ from pathlib import Path
 import re
 
 from model.preprocesador.preprocessor import preprocess
-from model.ensamblador.assembler_from_as import assemble_text, MNEMONIC_TABLE
+from model.ensamblador.assembler_from_as import assemble_text, data_word_count, MNEMONIC_TABLE
 from model.compilador.parser_spl import compile_high_level
 
 
@@ -30,10 +30,17 @@ def _find_repo_root(start: Path) -> Path:
 
 ROOT = _find_repo_root(Path(__file__).resolve())
 
+# Artifacts that pipeline_from_text can write next to the image
+ALL_ARTIFACTS = frozenset({'pp', 's', 'o', 'i', 'meta'})
 
-def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = 'image', source_file: Path = None):
+
+def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = 'image', source_file: Path = None,
+                       write_artifacts: bool = True, artifacts: frozenset = ALL_ARTIFACTS):
     """Process source_text through preprocessor, compiler, assembler and linker.
     Returns list of 64-bit strings (the final image) and writes an image file.
+
+    write_artifacts=False skips every file write; `artifacts` selects which of
+    'pp', 's', 'o', 'i' and 'meta' are written (all by default).
     
     Flujo:
     1. PREPROCESADOR: Expande macros y procesa includes
@@ -43,19 +50,24 @@ def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = '
     """
     if out_dir is None:
         out_dir = ROOT / 'Ejemplos' / 'SPL'
-    out_dir.mkdir(parents=True, exist_ok=True)
+    if not write_artifacts:
+        artifacts = frozenset()
+    if artifacts:
+        out_dir.mkdir(parents=True, exist_ok=True)
 
     # 1. PREPROCESADOR: Expande #define e #include
     preprocessed_text = preprocess(source_text, source_file)
     
     # Guardar código preprocesado para debugging
-    pp_path = out_dir / f'{basename}.pp'
-    pp_path.write_text(preprocessed_text, encoding='utf-8')
+    if 'pp' in artifacts:
+        pp_path = out_dir / f'{basename}.pp'
+        pp_path.write_text(preprocessed_text, encoding='utf-8')
 
     # 2. COMPILADOR: SPL -> ASM (incluye análisis sintáctico y semántico)
     s_text = compile_high_level(preprocessed_text)
-    s_path = out_dir / f'{basename}.s'
-    s_path.write_text(s_text, encoding='utf-8')
+    if 's' in artifacts:
+        s_path = out_dir / f'{basename}.s'
+        s_path.write_text(s_text, encoding='utf-8')
 
     # Assemble
     maybe = assemble_text(s_text)
@@ -66,10 +78,8 @@ def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = '
         meta = {}
 
     # Write minimal object-like file (.o) with INST and SYM entries
-    o_path = out_dir / f'{basename}.o'
-    with o_path.open('w', encoding='utf-8') as f:
-        for inst in insts:
-            f.write(f'INST: {inst}\n')
+    if 'o' in artifacts:
+        o_lines = [f'INST: {inst}\n' for inst in insts]
         try:
             # re-run a simple label extraction to get label positions
             raw_lines = [raw.split('//')[0].split(';')[0].rstrip() for raw in s_text.splitlines()]
@@ -80,15 +90,17 @@ def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = '
                     continue
                 if line.endswith(':'):
                     lbl = line[:-1].strip()
-                    f.write(f'SYM: {lbl},{instr_count},local\n')
+                    o_lines.append(f'SYM: {lbl},{instr_count},local\n')
                     continue
                 if line.startswith('.data'):
                     parts = [p.strip() for p in re.split('[,\\s]+', line) if p.strip()]
-                    instr_count += max(0, len(parts) - 1)
+                    instr_count += sum(data_word_count(dv) for dv in parts[1:])
                     continue
                 instr_count += 1
         except Exception:
             pass
+        o_path = out_dir / f'{basename}.o'
+        o_path.write_text(''.join(o_lines), encoding='utf-8')
 
     # Ensure PARA at the end when available
     try:
@@ -99,9 +111,10 @@ def pipeline_from_text(source_text: str, out_dir: Path = None, basename: str = '
         pass
 
     image_path = out_dir / f'{basename}.i'
-    image_path.write_text('\n'.join(insts) + '\n', encoding='utf-8')
+    if 'i' in artifacts:
+        image_path.write_text('\n'.join(insts) + '\n', encoding='utf-8')
 
-    if meta:
+    if meta and 'meta' in artifacts:
         meta_path = out_dir / f'{basename}.meta.json'
         try:
             import json
@@ -6,15 +6,255 @@ Implementa el metalenguaje de programación siguiendo el paradigma YACC:
 - Sin generación de código intermedio (ensamblador)
 """
 
-from typing import Any, Dict, List, Optional
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import operator
 import sys
 
 
+# Opcodes del bytecode de expresiones. Cada instrucción ocupa dos enteros en
+# `code`: el opcode y el índice de su operando en `consts`. Los saltos de
+# and/or guardan en `consts` el desplazamiento relativo hasta su destino.
+_OP_HANDLERS = (
+    '_op_load_const', '_op_load_var', '_op_load_str', '_op_parse_num',
+    '_op_binary', '_op_compare', '_op_jump_if_false', '_op_jump_if_true',
+    '_op_bool', '_op_neg', '_op_get_field', '_op_memref', '_op_bad_op',
+    '_op_raise',
+)
+(OP_LOAD_CONST, OP_LOAD_VAR, OP_LOAD_STR, OP_PARSE_NUM,
+ OP_BINARY, OP_COMPARE, OP_JUMP_IF_FALSE, OP_JUMP_IF_TRUE,
+ OP_BOOL, OP_NEG, OP_GET_FIELD, OP_MEMREF, OP_BAD_OP,
+ OP_RAISE) = range(len(_OP_HANDLERS))
+
+
+# Rango de las celdas del bloque contiguo de memoria (array 'q')
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _idiv(left, right):
+    if right == 0:
+        raise ZeroDivisionError("División por cero")
+    return left // right  # División entera
+
+
+# Operador -> (opcode, función del módulo operator que usa el opcode)
+_BINOPS = {
+    '+': (OP_BINARY, operator.add), '-': (OP_BINARY, operator.sub),
+    '*': (OP_BINARY, operator.mul), '/': (OP_BINARY, _idiv),
+    '%': (OP_BINARY, operator.mod),
+    '<': (OP_COMPARE, operator.lt), '<=': (OP_COMPARE, operator.le),
+    '>': (OP_COMPARE, operator.gt), '>=': (OP_COMPARE, operator.ge),
+    '==': (OP_COMPARE, operator.eq), '!=': (OP_COMPARE, operator.ne),
+}
+# and/or evalúan en cortocircuito: saltan el operando derecho si el
+# izquierdo ya decide el resultado
+_LOGIC_JUMPS = {'and': OP_JUMP_IF_FALSE, 'or': OP_JUMP_IF_TRUE}
+
+
+def _intern(name):
+    """
+    Interna un nombre de variable/campo (los no-str se dejan igual).
+    Los NAME ya llegan internados desde lex_spl; compile_expr y
+    compile_statement internan también los de ASTs construidos a mano, así
+    las búsquedas en variables/objects resuelven por identidad.
+    """
+    return sys.intern(name) if type(name) is str else name
+
+
+def _parse_number(text: str):
+    """Convierte un literal numérico a int o float (ValueError si no lo es)"""
+    if '.' in text or 'e' in text.lower():
+        return float(text)
+    return int(text)
+
+
+def compile_expr(expr_ast) -> Tuple[List[int], List[Any]]:
+    """
+    Compila un AST de expresión a bytecode de pila.
+    Retorna (code, consts): pares opcode/índice y el pool de constantes.
+    """
+    code: List[int] = []
+    consts: List[Any] = [None]  # índice 0: operando vacío
+    _compile_into(expr_ast, code, consts)
+    return code, consts
+
+
+def _emit(code: List[int], consts: List[Any], opcode: int, arg: Any = None):
+    if arg is None:
+        code += (opcode, 0)
+    else:
+        consts.append(arg)
+        code += (opcode, len(consts) - 1)
+
+
+def _fold_constants(code: List[int], consts: List[Any], start: int, arity: int,
+                    opcode: int, arg: Any = None) -> bool:
+    """
+    Si los operandos emitidos desde `start` son todos LOAD_CONST, evalúa la
+    operación en compilación y deja un único LOAD_CONST con el resultado.
+    Las operaciones que fallan (p.ej. división por cero) no se pliegan, para
+    que el error siga produciéndose al evaluar.
+    """
+    if len(code) != start + 2 * arity or any(code[i] != OP_LOAD_CONST for i in range(start, len(code), 2)):
+        return False
+    stack = [consts[code[i + 1]] for i in range(start, len(code), 2)]
+    try:
+        getattr(InterpreterContext, _OP_HANDLERS[opcode])(stack, arg, 0)
+    except Exception:
+        return False
+    # Cada LOAD_CONST añadió su operando al final del pool
+    del consts[code[start + 1]:]
+    del code[start:]
+    _emit(code, consts, OP_LOAD_CONST, stack[0])
+    return True
+
+
+# Tareas de la pila de trabajo de _compile_into
+(_TASK_NODE, _TASK_NEG, _TASK_BINOP, _TASK_LOGIC, _TASK_LOGIC_END,
+ _TASK_RAISE) = range(6)
+
+
+def _compile_into(expr_ast, code: List[int], consts: List[Any]):
+    """
+    Emite el bytecode de una expresión en el mismo orden en que se evalúa.
+    El recorrido usa una pila de trabajo explícita en lugar de recursión: los
+    operandos se apilan encima de la tarea que emite su operador, así que la
+    profundidad de la expresión no está limitada por la pila de Python.
+    """
+    work: List[Tuple[int, Any]] = [(_TASK_NODE, expr_ast)]
+    while work:
+        task, arg = work.pop()
+        if task == _TASK_NODE:
+            _compile_node(arg, code, consts, work)
+        elif task == _TASK_NEG:
+            if not _fold_constants(code, consts, arg, 1, OP_NEG):
+                _emit(code, consts, OP_NEG)
+        elif task == _TASK_BINOP:
+            op, start = arg
+            binop = _BINOPS.get(op) if isinstance(op, str) else None
+            if binop is None:
+                _emit(code, consts, OP_BAD_OP, op)
+            elif not _fold_constants(code, consts, start, 2, *binop):
+                _emit(code, consts, *binop)
+        elif task == _TASK_LOGIC:
+            # Operando izquierdo ya emitido: salto (destino pendiente) y derecho
+            jump, start, right = arg
+            work.append((_TASK_LOGIC_END, (start, len(code))))
+            work.append((_TASK_NODE, right))
+            _emit(code, consts, jump, 0)
+        elif task == _TASK_LOGIC_END:
+            _finish_logic(code, consts, *arg)
+        else:
+            _emit(code, consts, OP_RAISE, arg)
+
+
+def _finish_logic(code: List[int], consts: List[Any], start: int, jpos: int):
+    """
+    Cierra un and/or: normaliza el derecho a 1/0, fija el destino del salto
+    emitido en `jpos` y, si el izquierdo es constante, resuelve el salto en
+    compilación (el derecho desaparece o queda solo).
+    """
+    if not _fold_constants(code, consts, jpos + 2, 1, OP_BOOL):
+        _emit(code, consts, OP_BOOL)
+    consts[code[jpos + 1]] = len(code) - jpos
+    if jpos != start + 2 or code[start] != OP_LOAD_CONST:
+        return
+    is_and = code[jpos] == OP_JUMP_IF_FALSE
+    if is_and != bool(consts[code[start + 1]]):
+        # and con izquierdo falso / or con izquierdo verdadero
+        del consts[code[start + 1]:]
+        del code[start:]
+        _emit(code, consts, OP_LOAD_CONST, 0 if is_and else 1)
+        return
+    # El resultado es el del derecho: se quitan la constante y el salto
+    # (sus operandos son los dos primeros del pool desde `start`)
+    first = code[start + 1]
+    del consts[first:first + 2]
+    del code[start:jpos + 2]
+    for i in range(start + 1, len(code), 2):
+        if code[i]:
+            code[i] -= 2
+
+
+def _compile_node(expr_ast, code: List[int], consts: List[Any], work: List[Tuple[int, Any]]):
+    """Emite un nodo hoja o apila las tareas de un nodo compuesto"""
+    if isinstance(expr_ast, (int, float)):
+        _emit(code, consts, OP_LOAD_CONST, expr_ast)
+        return
+    if isinstance(expr_ast, str):
+        # String suelto: un literal numérico se resuelve ya (no puede ser un
+        # identificador); el resto es variable si existe o el propio texto
+        try:
+            _emit(code, consts, OP_LOAD_CONST, _parse_number(expr_ast))
+        except ValueError:
+            _emit(code, consts, OP_LOAD_STR, _intern(expr_ast))
+        return
+    if not isinstance(expr_ast, tuple) or len(expr_ast) == 0:
+        _emit(code, consts, OP_LOAD_CONST, 0)
+        return
+
+    node_type = expr_ast[0]
+    try:
+        if node_type == 'num' or node_type == 'number':
+            val = expr_ast[1]
+            if isinstance(val, (int, float)):
+                _emit(code, consts, OP_LOAD_CONST, val)
+            elif isinstance(val, str):
+                try:
+                    _emit(code, consts, OP_LOAD_CONST, _parse_number(val))
+                except ValueError:
+                    # Se deja el error para el momento de la evaluación
+                    _emit(code, consts, OP_PARSE_NUM, val)
+            else:
+                _emit(code, consts, OP_LOAD_CONST, 0)
+        elif node_type == 'name':
+            _emit(code, consts, OP_LOAD_VAR, _intern(expr_ast[1]))
+        elif node_type == 'uminus':
+            operand = expr_ast[1]
+            work.append((_TASK_NEG, len(code)))
+            work.append((_TASK_NODE, operand))
+        elif node_type == 'binop':
+            op, left = expr_ast[1], expr_ast[2]
+            try:
+                right = expr_ast[3]
+            except IndexError as exc:
+                # El operando izquierdo se evalúa antes de que falte el derecho
+                work.append((_TASK_RAISE, (type(exc), exc.args)))
+                work.append((_TASK_NODE, left))
+                return
+            jump = _LOGIC_JUMPS.get(op) if isinstance(op, str) else None
+            if jump is not None:
+                work.append((_TASK_LOGIC, (jump, len(code), right)))
+            else:
+                work.append((_TASK_BINOP, (op, len(code))))
+                work.append((_TASK_NODE, right))
+            work.append((_TASK_NODE, left))
+        elif node_type == 'field_access':
+            _emit(code, consts, OP_GET_FIELD, (_intern(expr_ast[1]), _intern(expr_ast[2])))
+        elif node_type == 'memref_label':
+            varname = _intern(expr_ast[1])
+            offset = expr_ast[2] if len(expr_ast) > 2 else 0
+            _emit(code, consts, OP_MEMREF, (varname, sys.intern(f"field_{offset}")))
+        else:
+            _emit(code, consts, OP_LOAD_CONST, 0)
+    except IndexError as exc:
+        _emit(code, consts, OP_RAISE, (type(exc), exc.args))
+
+
 class InterpreterContext:
     """
     Contexto de ejecución del intérprete YACC.
     Mantiene el estado durante la ejecución de acciones semánticas.
     """
+
+    __slots__ = (
+        'variables', 'types', 'type_instances', 'objects', 'call_stack',
+        'output', 'input_buffer', 'input_index',
+        'memory', '_memory_extra', 'next_mem_addr',
+        'break_flag', 'continue_flag', 'return_flag', 'return_value',
+        '_code_cache', '_stmt_cache', '_block_cache', '_dispatch',
+    )
     
     def __init__(self):
         # Memoria de variables: nombre -> valor
@@ -23,8 +263,12 @@ class InterpreterContext:
         # Tipos definidos: nombre_tipo -> lista de campos
         self.types: Dict[str, List[Dict[str, Any]]] = {}
         
-        # Memoria de objetos TDA: variable -> {field: value, ...}
-        self.objects: Dict[str, Dict[str, Any]] = {}
+        # Objetos TDA en layout SoA: por tipo, una lista de valores por campo
+        # (tipo -> {field: [valor_obj0, valor_obj1, ...]}); cada objeto guarda
+        # las columnas de su tipo y su índice en ellas:
+        # variable -> (columnas, índice)
+        self.type_instances: Dict[str, Dict[str, List[Any]]] = {}
+        self.objects: Dict[str, Tuple[Dict[str, List[Any]], int]] = {}
         
         # Stack de control para funciones/procedimientos
         self.call_stack: List[Dict[str, Any]] = []
@@ -36,8 +280,11 @@ class InterpreterContext:
         self.input_buffer: List[str] = []
         self.input_index: int = 0
         
-        # Memoria simulada (arrays, matrices)
-        self.memory: Dict[int, Any] = {}
+        # Memoria simulada (arrays, matrices): bloque contiguo de enteros de
+        # 64 bits para las direcciones asignadas; los valores que no caben en
+        # 'q' y las direcciones fuera del bloque van a una tabla auxiliar
+        self.memory = array('q')
+        self._memory_extra: Dict[int, Any] = {}
         self.next_mem_addr: int = 0
         
         # Control flow flags
@@ -45,24 +292,58 @@ class InterpreterContext:
         self.continue_flag: bool = False
         self.return_flag: bool = False
         self.return_value: Any = None
+
+        # Bytecode de expresiones: id(ast) -> (ast, code, consts)
+        self._code_cache: Dict[int, Tuple[Any, List[int], List[Any]]] = {}
+        # Statements compilados a closures: id(stmt) -> (stmt, fn)
+        self._stmt_cache: Dict[int, Tuple[Any, Callable]] = {}
+        # Bloques de statements compilados: id(lista) -> (lista, fns)
+        self._block_cache: Dict[int, Tuple[Any, Tuple[Callable, ...]]] = {}
+        # Tabla de despacho indexada por opcode (métodos ligados)
+        self._dispatch = tuple(getattr(self, name) for name in _OP_HANDLERS)
         
     def allocate_memory(self, size: int) -> int:
         """Asigna un bloque de memoria y retorna la dirección base"""
         base_addr = self.next_mem_addr
-        for i in range(size):
-            self.memory[base_addr + i] = 0
+        end_addr = base_addr + size
+        if size > 0:
+            memory = self.memory
+            if end_addr > len(memory):
+                memory.frombytes(bytes(8 * (end_addr - len(memory))))
+            start = max(base_addr, 0)
+            if start < end_addr:
+                memory[start:end_addr] = array('q', bytes(8 * (end_addr - start)))
+            extra = self._memory_extra
+            if extra:
+                for addr in [a for a in extra if base_addr <= a < end_addr]:
+                    del extra[addr]
+            for addr in range(base_addr, min(end_addr, 0)):
+                extra[addr] = 0
         self.next_mem_addr += size
         return base_addr
         
     def read_memory(self, addr: int) -> Any:
         """Lee un valor de memoria"""
-        if addr not in self.memory:
-            self.memory[addr] = 0
-        return self.memory[addr]
+        extra = self._memory_extra
+        if extra and addr in extra:
+            return extra[addr]
+        memory = self.memory
+        if isinstance(addr, int) and 0 <= addr < len(memory):
+            return memory[addr]
+        extra[addr] = 0
+        return 0
         
     def write_memory(self, addr: int, value: Any):
         """Escribe un valor en memoria"""
-        self.memory[addr] = value
+        memory = self.memory
+        extra = self._memory_extra
+        if (isinstance(addr, int) and 0 <= addr < len(memory)
+                and type(value) is int and _INT64_MIN <= value <= _INT64_MAX):
+            memory[addr] = value
+            if extra:
+                extra.pop(addr, None)
+        else:
+            extra[addr] = value
         
     def set_variable(self, name: str, value: Any):
         """Asigna valor a una variable"""
@@ -70,13 +351,16 @@ class InterpreterContext:
         
     def get_variable(self, name: str) -> Any:
         """Obtiene valor de una variable"""
-        if name not in self.variables:
-            raise NameError(f"Variable '{name}' no definida")
-        return self.variables[name]
+        try:
+            return self.variables[name]
+        except KeyError:
+            raise NameError(f"Variable '{name}' no definida") from None
         
     def declare_type(self, typename: str, fields: List[Dict[str, Any]]):
         """Declara un nuevo tipo (struct/class)"""
         self.types[typename] = fields
+        # Los objetos ya creados conservan las columnas del layout anterior
+        self.type_instances.pop(typename, None)
         
     def create_object(self, varname: str, typename: str, init_values: Optional[List[Any]] = None):
         """Crea una instancia de un tipo"""
@@ -84,45 +368,71 @@ class InterpreterContext:
             raise TypeError(f"Tipo '{typename}' no definido")
             
         fields = self.types[typename]
-        obj = {}
+        values = {}
         
-        # Inicializar campos
+        # Inicializar campos (un nombre repetido se queda con el último valor)
         for i, field_info in enumerate(fields):
             field_name = field_info['name']
             if init_values and i < len(init_values):
-                val = init_values[i]
-                # Preservar tipo (int o float)
-                if isinstance(val, (int, float)):
-                    obj[field_name] = val
-                else:
-                    obj[field_name] = val
+                values[field_name] = init_values[i]
             else:
-                obj[field_name] = 0  # Valor por defecto
+                values[field_name] = 0  # Valor por defecto
                 
-        self.objects[varname] = obj
+        columns = self.type_instances.get(typename)
+        if columns is None:
+            columns = self.type_instances[typename] = {name: [] for name in values}
+        index = len(next(iter(columns.values()), ()))
+        for field_name, val in values.items():
+            columns[field_name].append(val)
+            
+        self.objects[varname] = (columns, index)
         self.variables[varname] = varname  # Referencia al objeto
         
     def get_field(self, varname: str, fieldname: str) -> Any:
         """Obtiene el valor de un campo de un objeto"""
-        if varname not in self.objects:
-            raise NameError(f"Objeto '{varname}' no existe")
-        obj = self.objects[varname]
-        if fieldname not in obj:
-            raise AttributeError(f"Campo '{fieldname}' no existe en objeto '{varname}'")
-        return obj[fieldname]
+        try:
+            columns, index = self.objects[varname]
+        except KeyError:
+            raise NameError(f"Objeto '{varname}' no existe") from None
+        try:
+            return columns[fieldname][index]
+        except KeyError:
+            raise AttributeError(f"Campo '{fieldname}' no existe en objeto '{varname}'") from None
         
     def set_field(self, varname: str, fieldname: str, value: Any):
         """Asigna valor a un campo de un objeto"""
-        if varname not in self.objects:
-            raise NameError(f"Objeto '{varname}' no existe")
-        obj = self.objects[varname]
-        if fieldname not in obj:
-            raise AttributeError(f"Campo '{fieldname}' no existe en objeto '{varname}'")
-        obj[fieldname] = value
+        try:
+            columns, index = self.objects[varname]
+        except KeyError:
+            raise NameError(f"Objeto '{varname}' no existe") from None
+        try:
+            columns[fieldname][index] = value
+        except KeyError:
+            raise AttributeError(f"Campo '{fieldname}' no existe en objeto '{varname}'") from None
+        
+    def object_fields(self, varname: str) -> Dict[str, Any]:
+        """Retorna los campos de un objeto como {field: value}"""
+        try:
+            columns, index = self.objects[varname]
+        except KeyError:
+            raise NameError(f"Objeto '{varname}' no existe") from None
+        return {field: values[index] for field, values in columns.items()}
         
     def print_output(self, value: Any):
         """Agrega un valor al buffer de salida"""
         self.output.append(str(value))
+
+    def emit_output(self, value: Any):
+        """
+        Agrega un valor al buffer de salida y lo escribe en stdout.
+        Convierte una sola vez y hace un único write en lugar de pasar por
+        print() (que formatea sus argumentos y escribe texto y '\n' por
+        separado). sys.stdout se resuelve en cada llamada para respetar
+        redirecciones.
+        """
+        text = str(value)
+        self.output.append(text)
+        sys.stdout.write(text + '\n')
         
     def read_input(self) -> str:
         """Lee una línea del buffer de entrada"""
@@ -136,138 +446,180 @@ class InterpreterContext:
     def evaluate_expression(self, expr_ast) -> Any:
         """
         Evalúa un AST de expresión y retorna su valor.
-        Las expresiones vienen en formato tuple desde el parser.
+        Las expresiones vienen en formato tuple desde el parser; se compilan
+        una vez a bytecode (ver compile_expr) y se ejecutan en _eval_code.
         """
-        if expr_ast is None:
-            return 0
-            
-        # Número literal directo
-        if isinstance(expr_ast, (int, float)):
-            return expr_ast
-            
-        # String literal
-        if isinstance(expr_ast, str):
-            # Puede ser nombre de variable
-            if expr_ast in self.variables:
-                return self.variables[expr_ast]
-            # O intentar convertir a número
-            try:
-                # Detectar si es float
-                if '.' in expr_ast or 'e' in expr_ast.lower():
-                    return float(expr_ast)
-                return int(expr_ast)
-            except ValueError:
-                # Es un string literal
-                return expr_ast
-            
-        # Tupla (AST node)
-        if isinstance(expr_ast, tuple):
-            if len(expr_ast) == 0:
-                return 0
-                
-            node_type = expr_ast[0]
-            
-            # Número ('num', value)
-            if node_type == 'num' or node_type == 'number':
-                val = expr_ast[1]
-                # Mantener el tipo original (int o float)
-                if isinstance(val, (int, float)):
-                    return val
-                if isinstance(val, str):
-                    # Intentar convertir, detectar si es float
-                    if '.' in val or 'e' in val.lower():
-                        return float(val)
-                    return int(val)
-                return 0
-                
-            # Variable ('name', varname)
-            if node_type == 'name':
-                varname = expr_ast[1]
-                return self.get_variable(varname)
-                
-            # Operación unaria
-            if node_type == 'uminus':
-                operand = self.evaluate_expression(expr_ast[1])
-                return -operand
-                
-            # Operación binaria
-            if node_type == 'binop':
-                op = expr_ast[1]
-                left = self.evaluate_expression(expr_ast[2])
-                right = self.evaluate_expression(expr_ast[3])
-                
-                if op == '+':
-                    return left + right
-                elif op == '-':
-                    return left - right
-                elif op == '*':
-                    return left * right
-                elif op == '/':
-                    if right == 0:
-                        raise ZeroDivisionError("División por cero")
-                    return left // right  # División entera
-                elif op == '%':
-                    return left % right
-                elif op == '<':
-                    return 1 if left < right else 0
-                elif op == '<=':
-                    return 1 if left <= right else 0
-                elif op == '>':
-                    return 1 if left > right else 0
-                elif op == '>=':
-                    return 1 if left >= right else 0
-                elif op == '==':
-                    return 1 if left == right else 0
-                elif op == '!=':
-                    return 1 if left != right else 0
-                elif op == 'and':
-                    return 1 if (left and right) else 0
-                elif op == 'or':
-                    return 1 if (left or right) else 0
-                else:
-                    raise ValueError(f"Operador '{op}' no soportado")
-                    
-            # Acceso a campo (object.field)
-            if node_type == 'field_access':
-                varname = expr_ast[1]
-                fieldname = expr_ast[2]
-                return self.get_field(varname, fieldname)
-                
-            # Referencia a memoria (memref_label)
-            if node_type == 'memref_label':
-                varname = expr_ast[1]
-                offset = expr_ast[2] if len(expr_ast) > 2 else 0
-                return self.get_field(varname, f"field_{offset}") if varname in self.objects else self.get_variable(varname)
-                
-        return 0
-        
+        code, consts = self.compiled_expression(expr_ast)
+        return self._eval_code(code, consts)
+
+    def compiled_expression(self, expr_ast):
+        """Retorna (code, consts) de una expresión, compilándola si no está en caché"""
+        entry = self._code_cache.get(id(expr_ast))
+        # La entrada guarda el propio AST: así el id no puede reutilizarse
+        if entry is None or entry[0] is not expr_ast:
+            entry = (expr_ast,) + compile_expr(expr_ast)
+            self._code_cache[id(expr_ast)] = entry
+        return entry[1], entry[2]
+
+    def compiled_statement(self, stmt_ast) -> Callable:
+        """Retorna la closure compilada de un statement (ver compile_statement)"""
+        entry = self._stmt_cache.get(id(stmt_ast))
+        if entry is None or entry[0] is not stmt_ast:
+            entry = (stmt_ast, compile_statement(stmt_ast))
+            self._stmt_cache[id(stmt_ast)] = entry
+        return entry[1]
+
+    def compiled_block(self, stmts_list) -> Tuple[Callable, ...]:
+        """Retorna las closures compiladas de un bloque (ver compile_block)"""
+        entry = self._block_cache.get(id(stmts_list))
+        if entry is None or entry[0] is not stmts_list:
+            entry = (stmts_list, compile_block(stmts_list))
+            self._block_cache[id(stmts_list)] = entry
+        return entry[1]
+
+    def _eval_code(self, code: List[int], consts: List[Any]) -> Any:
+        """Ejecuta bytecode de expresión sobre una pila y retorna el resultado"""
+        stack: List[Any] = []
+        dispatch = self._dispatch
+        pc = 0
+        end = len(code)
+        while pc < end:
+            pc = dispatch[code[pc]](stack, consts[code[pc + 1]], pc)
+        return stack[-1]
+
+    # Manejadores de opcodes: reciben la pila, el operando del consts pool y
+    # su propio pc, y retornan el pc de la siguiente instrucción. Los
+    # binarios sacan el operando derecho y reemplazan el izquierdo. Los
+    # que no dependen del contexto son estáticos (compile_expr los usa para
+    # plegar constantes).
+    @staticmethod
+    def _op_load_const(stack, arg, pc):
+        stack.append(arg)
+        return pc + 2
+
+    def _op_load_var(self, stack, arg, pc):
+        stack.append(self.get_variable(arg))
+        return pc + 2
+
+    def _op_load_str(self, stack, arg, pc):
+        # String suelto no numérico: variable si existe, si no el propio texto
+        stack.append(self.variables.get(arg, arg))
+        return pc + 2
+
+    @staticmethod
+    def _op_parse_num(stack, arg, pc):
+        stack.append(_parse_number(arg))
+        return pc + 2
+
+    @staticmethod
+    def _op_binary(stack, arg, pc):
+        # arg: función de _BINOPS (operator.add, _idiv, ...)
+        right = stack.pop()
+        stack[-1] = arg(stack[-1], right)
+        return pc + 2
+
+    @staticmethod
+    def _op_compare(stack, arg, pc):
+        # Las comparaciones retornan 1/0, no bool
+        right = stack.pop()
+        stack[-1] = 1 if arg(stack[-1], right) else 0
+        return pc + 2
+
+    @staticmethod
+    def _op_jump_if_false(stack, arg, pc):
+        # and: con el izquierdo falso el resultado es 0 sin evaluar el derecho
+        if stack[-1]:
+            stack.pop()
+            return pc + 2
+        stack[-1] = 0
+        return pc + arg
+
+    @staticmethod
+    def _op_jump_if_true(stack, arg, pc):
+        # or: con el izquierdo verdadero el resultado es 1 sin evaluar el derecho
+        if stack[-1]:
+            stack[-1] = 1
+            return pc + arg
+        stack.pop()
+        return pc + 2
+
+    @staticmethod
+    def _op_bool(stack, arg, pc):
+        stack[-1] = 1 if stack[-1] else 0
+        return pc + 2
+
+    @staticmethod
+    def _op_neg(stack, arg, pc):
+        stack[-1] = -stack[-1]
+        return pc + 2
+
+    def _op_get_field(self, stack, arg, pc):
+        stack.append(self.get_field(arg[0], arg[1]))
+        return pc + 2
+
+    def _op_memref(self, stack, arg, pc):
+        varname, fieldname = arg
+        stack.append(self.get_field(varname, fieldname) if varname in self.objects else self.get_variable(varname))
+        return pc + 2
+
+    @staticmethod
+    def _op_bad_op(stack, arg, pc):
+        raise ValueError(f"Operador '{arg}' no soportado")
+
+    @staticmethod
+    def _op_raise(stack, arg, pc):
+        # Nodo mal formado: el error se lanza en el mismo orden que al recorrer el árbol
+        exc_type, exc_args = arg
+        raise exc_type(*exc_args)
+
     def reset(self):
         """Reinicia el contexto del intérprete"""
         self.variables.clear()
         self.types.clear()
         self.objects.clear()
+        self.type_instances.clear()
         self.call_stack.clear()
         self.output.clear()
-        self.memory.clear()
+        del self.memory[:]
+        self._memory_extra.clear()
         self.next_mem_addr = 0
         self.input_index = 0
         self.break_flag = False
         self.continue_flag = False
         self.return_flag = False
         self.return_value = None
+        self._code_cache.clear()
+        self._stmt_cache.clear()
+        self._block_cache.clear()
 
 
 # Instancia global del intérprete
 interpreter: Optional[InterpreterContext] = None
 
+# Contextos devueltos con release_interpreter, listos para reutilizarse
+_CTX_POOL: List[InterpreterContext] = []
+_CTX_POOL_MAX = 4
+
 
 def init_interpreter():
     """Inicializa el contexto global del intérprete"""
     global interpreter
-    interpreter = InterpreterContext()
+    if _CTX_POOL:
+        interpreter = _CTX_POOL.pop()
+        interpreter.reset()
+        # Lista nueva: la anterior puede pertenecer al llamador
+        interpreter.input_buffer = []
+    else:
+        interpreter = InterpreterContext()
     return interpreter
 
 
+def release_interpreter(ctx: InterpreterContext):
+    """Devuelve un contexto que ya no se usa para que init_interpreter lo reutilice"""
+    if len(_CTX_POOL) < _CTX_POOL_MAX and all(c is not ctx for c in _CTX_POOL):
+        _CTX_POOL.append(ctx)
+
+
 def get_interpreter() -> InterpreterContext:
     """Obtiene la instancia del intérprete"""
     global interpreter
@@ -328,56 +680,294 @@ def execute_statement(stmt_ast):
             
         # If statement: ('if', condition_ast, then_stmts, else_stmts)
         elif stmt_type == 'if':
-            condition = ctx.evaluate_expression(stmt_ast[1])
-            if condition:
-                execute_statements(stmt_ast[2])
-            elif len(stmt_ast) > 3 and stmt_ast[3]:
-                execute_statements(stmt_ast[3])
+            # Condición y ramas compiladas una sola vez (ver compile_statement)
+            ctx.compiled_statement(stmt_ast)(ctx)
                 
         # While loop: ('while', condition_ast, body_stmts)
         elif stmt_type == 'while':
-            while True:
-                condition = ctx.evaluate_expression(stmt_ast[1])
-                if not condition:
-                    break
-                execute_statements(stmt_ast[2])
-                if ctx.break_flag:
-                    ctx.break_flag = False
-                    break
-                if ctx.continue_flag:
-                    ctx.continue_flag = False
-                    continue
+            # Condición y cuerpo se compilan una sola vez (ver compile_statement)
+            ctx.compiled_statement(stmt_ast)(ctx)
                     
         # Print: ('print', expr_ast)
         elif stmt_type == 'print':
             value = ctx.evaluate_expression(stmt_ast[1])
-            ctx.print_output(value)
-            print(value)  # También imprimir a stdout
+            ctx.emit_output(value)
             
         # Input: ('input', varname)
         elif stmt_type == 'input':
             varname = stmt_ast[1]
-            value = ctx.read_input()
-            try:
-                if '.' in value or 'e' in value.lower():
-                    value = float(value)
-                else:
-                    value = int(value)
-            except ValueError:
-                pass
+            value = _coerce_input(ctx.read_input())
             ctx.set_variable(varname, value)
 
 
 def execute_statements(stmts_list):
-    """Ejecuta una lista de statements"""
+    """
+    Ejecuta una lista de statements.
+    La lista se compila una vez (caché por id) y se ejecuta como una
+    secuencia de closures; no debe modificarse después de ejecutarla.
+    """
     if stmts_list is None:
         return
         
+    ctx = get_interpreter()
+    for fn in ctx.compiled_block(stmts_list):
+        fn(ctx)
+
+
+def _coerce_input(value: str) -> Any:
+    """Convierte una línea de input a int/float cuando es numérica"""
+    try:
+        if '.' in value or 'e' in value.lower():
+            return float(value)
+        return int(value)
+    except ValueError:
+        return value
+
+
+# -----------------------
+# Expresiones nativas
+# -----------------------
+# Las expresiones de los statements compilados que se evalúan muchas veces
+# (condiciones y cuerpos de bucles) se traducen de bytecode a una función
+# Python en línea recta, sin despacho por opcode: CPython ejecuta entonces la
+# aritmética directamente. Solo se traducen las que operan con variables y
+# constantes; si la función nativa lanza cualquier excepción se repite la
+# evaluación en la VM, que produce el error exacto (las expresiones no tienen
+# efectos secundarios).
+
+_NATIVE_THRESHOLD = 16  # evaluaciones en la VM antes de generar la nativa
+
+_NATIVE_BINARY = {
+    operator.add: '+', operator.sub: '-', operator.mul: '*',
+    _idiv: '//', operator.mod: '%',
+}
+_NATIVE_COMPARE = {
+    operator.lt: '<', operator.le: '<=', operator.gt: '>',
+    operator.ge: '>=', operator.eq: '==', operator.ne: '!=',
+}
+
+
+def _native_source(code: List[int], consts: List[Any]) -> Optional[str]:
+    """
+    Fuente de una función _native(v) equivalente al bytecode (v: dict de
+    variables; kN: constante N del pool), o None si usa opcodes que no se
+    traducen. Los and/or se traducen a un if anidado que solo evalúa el
+    operando derecho cuando el izquierdo no decide.
+
+    Cada variable se lee de v una sola vez: `slots` es la tabla de símbolos
+    de la función (nombre -> temporal local que ya tiene su valor), así las
+    repeticiones usan variables locales de CPython en lugar de volver a
+    buscar en el dict. Una lectura dentro de un if solo se reutiliza dentro
+    de ese if.
+    """
+    lines = []
+    stack = []
+    slots = {}
+    open_jumps = []  # (pc destino, temporal del resultado, slots de fuera) por and/or abierto
+    indent = "    "
+    for pc in range(0, len(code), 2):
+        while open_jumps and open_jumps[-1][0] == pc:
+            slots = open_jumps[-1][2]
+            indent = _close_native_jump(lines, stack, open_jumps, indent)
+        opcode, arg = code[pc], code[pc + 1]
+        tmp = f"t{pc >> 1}"
+        if opcode == OP_LOAD_CONST:
+            stack.append(f"k{arg}")
+            continue
+        if opcode == OP_LOAD_VAR:
+            name = consts[arg]
+            if type(name) is str:
+                if name in slots:
+                    stack.append(slots[name])
+                    continue
+                slots[name] = tmp
+            lines.append(f"{indent}{tmp} = v[k{arg}]")
+        elif opcode == OP_NEG:
+            lines.append(f"{indent}{tmp} = -{stack.pop()}")
+        elif opcode in (OP_JUMP_IF_FALSE, OP_JUMP_IF_TRUE):
+            left = stack.pop()
+            if opcode == OP_JUMP_IF_FALSE:
+                lines.append(f"{indent}{tmp} = 0")
+                lines.append(f"{indent}if {left}:")
+            else:
+                lines.append(f"{indent}{tmp} = 1")
+                lines.append(f"{indent}if not {left}:")
+            open_jumps.append((pc + consts[arg], tmp, slots))
+            slots = dict(slots)
+            indent += "    "
+            continue
+        elif opcode == OP_BOOL:
+            lines.append(f"{indent}{tmp} = 1 if {stack.pop()} else 0")
+        elif opcode in (OP_BINARY, OP_COMPARE):
+            right = stack.pop()
+            left = stack.pop()
+            if opcode == OP_BINARY and consts[arg] in _NATIVE_BINARY:
+                lines.append(f"{indent}{tmp} = {left} {_NATIVE_BINARY[consts[arg]]} {right}")
+            elif opcode == OP_COMPARE and consts[arg] in _NATIVE_COMPARE:
+                lines.append(f"{indent}{tmp} = 1 if {left} {_NATIVE_COMPARE[consts[arg]]} {right} else 0")
+            else:
+                return None
+        else:
+            return None
+        stack.append(tmp)
+    while open_jumps:
+        slots = open_jumps[-1][2]
+        indent = _close_native_jump(lines, stack, open_jumps, indent)
+    lines.append(f"    return {stack[-1]}")
+    return "def _native(v):\n" + "\n".join(lines)
+
+
+def _close_native_jump(lines: List[str], stack: List[str], open_jumps: List[Tuple[int, str, dict]],
+                       indent: str) -> str:
+    """Cierra el if de un and/or: su resultado es el valor del derecho"""
+    tmp = open_jumps.pop()[1]
+    lines.append(f"{indent}{tmp} = {stack.pop()}")
+    stack.append(tmp)
+    return indent[:-4]
+
+
+def _expr_evaluator(expr_ast) -> Callable:
+    """
+    Compila una expresión y retorna evaluate(ctx). Empieza en la VM y, tras
+    _NATIVE_THRESHOLD evaluaciones, pasa a la función nativa si existe.
+    """
+    code, consts = compile_expr(expr_ast)
+    source = _native_source(code, consts)
+    if source is None:
+        return lambda ctx: ctx._eval_code(code, consts)
+
+    calls = 0
+    native = None
+
+    def evaluate(ctx):
+        nonlocal calls, native
+        if native is None:
+            calls += 1
+            if calls < _NATIVE_THRESHOLD:
+                return ctx._eval_code(code, consts)
+            namespace = {f"k{i}": value for i, value in enumerate(consts)}
+            exec(source, namespace)
+            native = namespace['_native']
+        try:
+            return native(ctx.variables)
+        except Exception:
+            return ctx._eval_code(code, consts)
+    return evaluate
+
+
+# -----------------------
+# Compilación de statements a closures
+# -----------------------
+# Cada statement se convierte una vez en una función fn(ctx); los bucles
+# ejecutan así una lista de llamadas en vez de volver a recorrer tuplas.
+
+def _noop(ctx):
+    pass
+
+
+def _raise_index_error(ctx):
+    # Statement mal formado: mismo error que al indexar la tupla al ejecutarlo
+    raise IndexError("tuple index out of range")
+
+
+def compile_block(stmts_list) -> Tuple[Callable, ...]:
+    """
+    Compila una lista de statements (misma forma que acepta
+    execute_statements) a una tupla de closures fn(ctx).
+    """
+    if stmts_list is None:
+        return ()
     if isinstance(stmts_list, list):
-        for stmt in stmts_list:
-            execute_statement(stmt)
-    else:
-        execute_statement(stmts_list)
+        return tuple(compile_statement(stmt) for stmt in stmts_list)
+    return (compile_statement(stmts_list),)
+
+
+def compile_statement(stmt_ast) -> Callable:
+    """
+    Compila un statement del AST a una función fn(ctx) equivalente a
+    execute_statement.
+    """
+    if not isinstance(stmt_ast, tuple) or len(stmt_ast) == 0:
+        return _noop
+    try:
+        return _compile_statement(stmt_ast[0], stmt_ast)
+    except IndexError:
+        return _raise_index_error
+
+
+def _compile_statement(stmt_type, stmt_ast) -> Callable:
+    if stmt_type == 'assign':
+        varname = _intern(stmt_ast[1])
+        evaluate = _expr_evaluator(stmt_ast[2])
+
+        def _assign(ctx):
+            ctx.variables[varname] = evaluate(ctx)
+        return _assign
+
+    if stmt_type == 'field_assign':
+        varname, fieldname = _intern(stmt_ast[1]), _intern(stmt_ast[2])
+        evaluate = _expr_evaluator(stmt_ast[3])
+
+        def _field_assign(ctx):
+            ctx.set_field(varname, fieldname, evaluate(ctx))
+        return _field_assign
+
+    if stmt_type == 'type_decl':
+        typename, fields = stmt_ast[1], stmt_ast[2]
+
+        def _type_decl(ctx):
+            ctx.declare_type(typename, fields)
+        return _type_decl
+
+    if stmt_type == 'var_decl':
+        varname, typename = _intern(stmt_ast[1]), stmt_ast[2]
+        init_values = stmt_ast[3] if len(stmt_ast) > 3 else None
+
+        def _var_decl(ctx):
+            ctx.create_object(varname, typename, init_values)
+        return _var_decl
+
+    if stmt_type == 'if':
+        evaluate = _expr_evaluator(stmt_ast[1])
+        then_fns = compile_block(stmt_ast[2]) if len(stmt_ast) > 2 else (_raise_index_error,)
+        else_fns = compile_block(stmt_ast[3]) if len(stmt_ast) > 3 and stmt_ast[3] else ()
+
+        def _if(ctx):
+            for fn in (then_fns if evaluate(ctx) else else_fns):
+                fn(ctx)
+        return _if
+
+    if stmt_type == 'while':
+        evaluate = _expr_evaluator(stmt_ast[1])
+        body_fns = compile_block(stmt_ast[2]) if len(stmt_ast) > 2 else (_raise_index_error,)
+
+        def _while(ctx):
+            while evaluate(ctx):
+                for fn in body_fns:
+                    fn(ctx)
+                if ctx.break_flag:
+                    ctx.break_flag = False
+                    break
+                if ctx.continue_flag:
+                    ctx.continue_flag = False
+        return _while
+
+    if stmt_type == 'print':
+        evaluate = _expr_evaluator(stmt_ast[1])
+
+        def _print(ctx):
+            value = evaluate(ctx)
+            ctx.emit_output(value)
+        return _print
+
+    if stmt_type == 'input':
+        varname = _intern(stmt_ast[1])
+
+        def _input(ctx):
+            ctx.set_variable(varname, _coerce_input(ctx.read_input()))
+        return _input
+
+    return _noop
 
 
 def interpret_program(source_code: str, input_data: Optional[List[str]] = None):
@@ -4,6 +4,9 @@ Moved from tools/ to model/compilador.
 """
 from __future__ import annotations
 
+import re
+import sys
+
 try:
     import ply.lex as lex
 except Exception as e:
@@ -98,15 +101,22 @@ def t_DIRECTIVE(t):
     t.value = t.value
     return t
 
+def _int_literal(s):
+    # int(s, 0) resolves the 0x/0b prefix in C; it rejects decimals with
+    # leading zeros ('007'), which the token patterns allow
+    try:
+        return int(s, 0)
+    except ValueError:
+        return int(s, 10)
+
+
+def _memref_value(text):
+    return _int_literal(text[2:-1])
+
+
 def t_MEMREF(t):
     r"M\[(0x[0-9A-Fa-f]+|0b[01]+|[0-9]+)\]"
-    inner = t.value[2:-1]
-    if inner.startswith('0x') or inner.startswith('0X'):
-        t.value = int(inner, 16)
-    elif inner.startswith('0b') or inner.startswith('0B'):
-        t.value = int(inner, 2)
-    else:
-        t.value = int(inner, 10)
+    t.value = _memref_value(t.value)
     return t
 
 def t_REGISTER(t):
@@ -114,36 +124,34 @@ def t_REGISTER(t):
     t.value = int(t.value[1:])
     return t
 
+# Keywords recognised before ':' (anything else there is a NAME)
+_LABEL_KEYWORDS = {'while': 'WHILE', 'if': 'IF', 'else': 'ELSE', 'begin': 'BEGIN', 'end': 'END'}
+
+
+def _label_token(val):
+    """(type, value) for an identifier followed by ':'."""
+    low = val.lower()
+    kind = _LABEL_KEYWORDS.get(low)
+    if kind is not None:
+        return kind, low
+    return 'NAME', sys.intern(val)
+
+
 def t_LABEL(t):
     r"[A-Za-z_][A-Za-z_0-9]*(?=:)"
-    val = t.value
-    low = val.lower()
-    if low == 'while':
-        t.type = 'WHILE'; t.value = low
-    elif low == 'if':
-        t.type = 'IF'; t.value = low
-    elif low == 'else':
-        t.type = 'ELSE'; t.value = low
-    elif low == 'begin':
-        t.type = 'BEGIN'; t.value = low
-    elif low == 'end':
-        t.type = 'END'; t.value = low
-    else:
-        t.type = 'NAME'; t.value = val
+    t.type, t.value = _label_token(t.value)
     return t
 
-def t_NUMBER(t):
-    r"[0-9]+\.[0-9]+([eE][+-]?[0-9]+)?|[0-9]+([eE][+-]?[0-9]+)|0x[0-9A-Fa-f]+|0b[01]+|[0-9]+"
-    s = t.value
+def _number_value(s):
     # Detectar si es float (tiene punto decimal o notación científica)
     if '.' in s or 'e' in s.lower():
-        t.value = float(s)
-    elif s.startswith(('0x', '0X')):
-        t.value = int(s, 16)
-    elif s.startswith(('0b', '0B')):
-        t.value = int(s, 2)
-    else:
-        t.value = int(s, 10)
+        return float(s)
+    return _int_literal(s)
+
+
+def t_NUMBER(t):
+    r"[0-9]+\.[0-9]+([eE][+-]?[0-9]+)?|[0-9]+([eE][+-]?[0-9]+)|0x[0-9A-Fa-f]+|0b[01]+|[0-9]+"
+    t.value = _number_value(t.value)
     return t
 
 
@@ -201,15 +209,47 @@ isa_mnemonics = {
     'simenor': 'RESEV', 'interrup': 'RESEV',
 }
 
+# reserved and isa_mnemonics merged into one lookup (reserved words win)
+_KEYWORDS = dict.fromkeys(isa_mnemonics, 'RESEV')
+_KEYWORDS.update(reserved)
+
+# Identifier as written -> (type, value), filled on first sight and seeded
+# with the usual spellings of every keyword, so most NAME tokens cost one
+# dict lookup and no lower() call
+_NAME_TOKENS = {}
+_NAME_TOKENS_MAX = 1 << 16
+
+
+def _name_token(val):
+    """(type, value) for an identifier: reserved word, ISA mnemonic or NAME.
+
+    NAME values are interned so the interpreter's name-keyed dict lookups
+    can match on identity.
+    """
+    tok = _NAME_TOKENS.get(val)
+    if tok is None:
+        low = val.lower()
+        kind = _KEYWORDS.get(low)
+        if kind is None:
+            tok = ('NAME', sys.intern(val))
+        elif kind == 'RESEV':
+            tok = ('RESEV', val)
+        else:
+            tok = (kind, low)
+        if len(_NAME_TOKENS) < _NAME_TOKENS_MAX:
+            _NAME_TOKENS[val] = tok
+    return tok
+
+
+for _kw in _KEYWORDS:
+    for _spelling in (_kw, _kw.upper(), _kw.capitalize()):
+        _name_token(_spelling)
+del _kw, _spelling
+
+
 def t_NAME(t):
     r"[A-Za-z_][A-Za-z_0-9]*"
-    val = t.value; low = val.lower()
-    if low in reserved:
-        t.type = reserved[low]; t.value = low
-    elif low in isa_mnemonics:
-        t.type = 'RESEV'; t.value = val
-    else:
-        t.type = 'NAME'; t.value = val
+    t.type, t.value = _name_token(t.value)
     return t
 
 def t_COMMENT(t):
@@ -226,19 +266,66 @@ def t_error(t):
     raise SyntaxError(f"Illegal character '{t.value[0]}' at line {t.lexer.lineno}")
 
 
+# Master PLY lexer, built on first use; build_lexer() hands out clones
+_LEXER = None
+
+
 def build_lexer(**kwargs):
-    return lex.lex(**kwargs)
+    global _LEXER
+    if kwargs:
+        return lex.lex(**kwargs)
+    if _LEXER is None:
+        _LEXER = lex.lex()
+    return _LEXER.clone()
+
+
+# tokenize() scanner: the same rules PLY uses, joined into one master pattern
+# in PLY's order (functions by definition, then strings by decreasing regex
+# length, compiled with re.VERBOSE), without building a LexToken per token.
+_FUNC_RULES = (
+    ('DIRECTIVE', t_DIRECTIVE), ('MEMREF', t_MEMREF), ('REGISTER', t_REGISTER),
+    ('LABEL', t_LABEL), ('NUMBER', t_NUMBER), ('STRING', t_STRING),
+    ('NAME', t_NAME), ('COMMENT', t_COMMENT), ('newline', t_newline),
+)
+_STRING_RULES = sorted(
+    ((name[2:], pattern) for name, pattern in list(globals().items())
+     if name.startswith('t_') and name != 't_ignore' and isinstance(pattern, str)),
+    key=lambda rule: len(rule[1]), reverse=True)
+
+_MASTER = re.compile('|'.join(
+    ['(?P<ignore>[%s]+)' % re.escape(t_ignore)]
+    + ['(?P<%s>%s)' % (name, func.__doc__) for name, func in _FUNC_RULES]
+    + ['(?P<%s>%s)' % rule for rule in _STRING_RULES]
+    + ['(?P<error>.)']), re.VERBOSE)
 
 
 def tokenize(text: str):
-    lexer = build_lexer()
-    lexer.input(text)
     out = []
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break
-        out.append((tok.type, tok.value, tok.lineno))
+    append = out.append
+    lineno = 1
+    for m in _MASTER.finditer(text):
+        kind = m.lastgroup
+        value = m.group()
+        if kind == 'NAME':
+            append(_name_token(value) + (lineno,))
+        elif kind == 'ignore' or kind == 'COMMENT':
+            continue
+        elif kind == 'newline':
+            lineno += len(value)
+        elif kind == 'NUMBER':
+            append(('NUMBER', _number_value(value), lineno))
+        elif kind == 'LABEL':
+            append(_label_token(value) + (lineno,))
+        elif kind == 'MEMREF':
+            append(('MEMREF', _memref_value(value), lineno))
+        elif kind == 'REGISTER':
+            append(('REGISTER', int(value[1:]), lineno))
+        elif kind == 'STRING':
+            append(('STRING', value[1:-1], lineno))
+        elif kind == 'error':
+            raise SyntaxError(f"Illegal character '{value}' at line {lineno}")
+        else:
+            append((kind, value, lineno))
     return out
 
 
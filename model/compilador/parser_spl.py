@@ -6,14 +6,22 @@ adapted to model packages.
 """
 from __future__ import annotations
 
+from contextlib import contextmanager
 from typing import List
+import operator
+import struct
+import sys
 import ply.lex as lex
 import ply.yacc as yacc
+import constants
 from . import lex_spl
 from .spl_to_asm import compile_euclides
 from model.ensamblador.assembler_from_as import MNEMONIC_TABLE
 import re
 
+# Address of the memory-mapped E/S port used by input and print
+_ES_ADDR = constants.E_S_RANGE[0]
+
 # Flag global para modo de operación
 INTERPRETER_MODE = False  # False = compilar, True = interpretar
 
@@ -49,6 +57,12 @@ class ParserContext:
         self.temp_count = 0
         self.label_count = 0
         self.max_var_reg = reg_start - 1  # Track highest register used by variables
+        # Released short-lived temporaries, reused before allocating new ones
+        self.free_regs: List[int] = []
+        # Common-subexpression cache for the statement being emitted:
+        # canonical AST id -> (register holding its value, names it reads)
+        self.expr_cache: dict = {}
+        self.expr_dest: int | None = None  # target of the current top-level expression
 
     def reg_for(self, var: str) -> int:
         if var in self.var_map:
@@ -56,37 +70,124 @@ class ParserContext:
         if self.next_reg > self.reg_end:
             raise RuntimeError(f"Out of registers! Cannot allocate register for variable '{var}'")
         r = self.next_reg
+        self._claim(r)
         self.var_map[var] = r
         self.next_reg += 1
         self.max_var_reg = max(self.max_var_reg, r)  # Track max variable register
         return r
 
     def new_temp(self) -> int:
-        # Temporaries can wrap around, but only in the temp space above variables
-        # If we've allocated variables up to R7, temps cycle from R8-R63
-        temp_start = self.max_var_reg + 1
-        if temp_start > self.reg_end:
-            raise RuntimeError("Out of registers for temporaries!")
-        
+        # Fresh registers only: wrapping around could hand out one still live
         if self.next_reg > self.reg_end:
-            self.next_reg = temp_start  # Wrap to first temp register, not reg_start
+            raise RuntimeError("Out of registers for temporaries!")
         r = self.next_reg
+        self._claim(r)
         self.next_reg += 1
         self.temp_count += 1
         return r
 
+    def loop_temp(self, body) -> int:
+        """
+        Register for a value live across an already parsed loop body (the
+        bound compared on every iteration). Reuses a register handed out
+        earlier that is neither a variable nor mentioned in the body, else
+        takes a fresh one. An enclosing loop sees this register in its own
+        body and avoids it in turn; once the loop exits it is free again.
+        """
+        busy = set(self.var_map.values())
+        for ln in _flatten_lines(body):
+            busy.update(int(n) for n in _REG_REF_RE.findall(ln))
+        for r in range(self.reg_start, min(self.next_reg, self.reg_end + 1)):
+            if r not in busy:
+                self.forget_reg(r)
+                self.temp_count += 1
+                return r
+        if self.next_reg > self.reg_end:
+            raise RuntimeError("Out of registers for loop bound!")
+        return self.new_temp()
+
+    def _claim(self, r: int):
+        if r in self.free_regs:
+            self.free_regs.remove(r)
+        self.forget_reg(r)
+
+    def acquire_temp(self) -> int:
+        """
+        Short-lived temporary: reuses a released register when available.
+        Only for values whose whole live range lies inside the lines being
+        emitted; values that stay live across other code (e.g. a loop bound
+        compared on every iteration of a body parsed earlier) must use
+        loop_temp(), which avoids every register the body uses.
+        """
+        free = self.free_regs
+        # Prefer registers that do not hold a cached subexpression, and
+        # evict one only once fresh registers run out
+        for i in range(len(free) - 1, -1, -1):
+            if not self._holds_expr(free[i]):
+                return free.pop(i)
+        if free and self.next_reg > self.reg_end:
+            r = free.pop()
+            self.forget_reg(r)
+            return r
+        return self.new_temp()
+
+    def release_temp(self, r: int):
+        self.free_regs.append(r)
+
+    @contextmanager
+    def temp(self):
+        r = self.acquire_temp()
+        try:
+            yield r
+        finally:
+            self.release_temp(r)
+
+    def _holds_expr(self, r: int) -> bool:
+        return any(reg == r for reg, _ in self.expr_cache.values())
+
+    def lookup_expr(self, key) -> int | None:
+        entry = self.expr_cache.get(key)
+        return None if entry is None else entry[0]
+
+    def remember_expr(self, key, names, r: int):
+        # A subexpression reading the destination register may see it
+        # already overwritten, so it is never reused
+        if any(self.var_map.get(n) == self.expr_dest for n in names):
+            return
+        self.expr_cache[key] = (r, names)
+
+    def forget_reg(self, r: int):
+        """Drop cached subexpressions held in, or reading, register r."""
+        if not self.expr_cache:
+            return
+        stale = [key for key, (reg, names) in self.expr_cache.items()
+                 if reg == r or any(self.var_map.get(n) == r for n in names)]
+        for key in stale:
+            del self.expr_cache[key]
+
+    def clear_expr_cache(self):
+        self.expr_cache.clear()
+        self.expr_dest = None
+
     def new_label(self, prefix: str = 'L') -> str:
         self.label_count += 1
-        return f"{prefix}_{self.label_count}"
+        # Interned: a label is referenced from many emitted lines
+        return sys.intern(f"{prefix}_{self.label_count}")
 
 
 ctx: ParserContext | None = None
 
+# Register operands in emitted lines, for loop_temp()
+_REG_REF_RE = re.compile(r"\bR(\d+)\b")
+
 # Type system: map type name -> dict with 'fields' list and field metadata
 # Fields can be:
 #   - Simple: ['x', 'y'] for backward compatibility
 #   - With visibility: [{'name': 'x', 'visibility': 'public'}, ...]
 type_table: dict = {}
+# Reverse index for field lookups: field name -> (type name, offset) in the
+# first type of type_table that declares it
+field_index: dict = {}
 # Scope tracking for encapsulation enforcement
 # When inside a type definition, this holds the type name
 current_type_scope: str | None = None
@@ -98,11 +199,18 @@ current_module: str | None = None  # Currently defined module
 imported_modules: dict = {}  # module_name -> list of imported symbols
 # Data section lines collected during parsing (.data and labels)
 _data_section: list = []
+# Read-only 64-bit constants already placed in _data_section: value -> label
+_data_pool: dict = {}
 # Array dimension registry: name -> list of dimensions (e.g. [rows] or [rows,cols])
 array_dims: dict = {}
 # Array column variable mapping: array_name -> variable_name containing column count
 # For dynamic arrays where column count is determined at runtime
 array_col_var: dict = {}
+# Hash-consing table for expression ASTs: structural key -> canonical node.
+# Identical subtrees (e.g. every ('name', 'i') in a loop body) share a
+# single tuple, so id()-keyed caches downstream hit across occurrences.
+_INTERN: dict = {}
+_INTERN_IDS: dict = {}  # id(canonical node) -> node, for O(1) re-interning
 
 
 def _normalize_fields(fields):
@@ -150,6 +258,35 @@ def _get_field_info(typename, fieldname):
     return None
 
 
+def _register_type(typename, normalized):
+    """Registra un tipo en type_table y mantiene field_index al día"""
+    redefined = typename in type_table
+    type_table[typename] = normalized
+    if redefined:
+        # Un tipo redefinido conserva su posición: se reconstruye el índice
+        field_index.clear()
+        types = type_table.items()
+    else:
+        types = ((typename, normalized),)
+    for tname, fields in types:
+        for offset, field in enumerate(fields):
+            name = field['name'] if isinstance(field, dict) else field
+            field_index.setdefault(name, (tname, offset))
+
+
+def _lookup_field(var, field):
+    """
+    Resuelve un acceso var.field: retorna el offset del campo validando su
+    visibilidad (SyntaxError si no existe o no es accesible).
+    """
+    try:
+        tname, offset = field_index[field]
+    except KeyError:
+        raise SyntaxError(f"Unknown field '{field}' for variable {var}") from None
+    _check_field_access(tname, field, "external")
+    return offset
+
+
 def _check_field_access(typename, fieldname, context="external"):
     """
     Valida si el acceso a un campo es permitido según su visibilidad.
@@ -177,44 +314,80 @@ def _check_field_access(typename, fieldname, context="external"):
     return field_info
 
 
+def _intern_key(x):
+    if type(x) is tuple:
+        return id(intern_ast(x))
+    if type(x) is float:
+        # 0.0 == -0.0 and 1 == 1.0 == True: key floats by repr and every
+        # leaf by type so equal-but-distinct literals never merge
+        return (float, repr(x))
+    return (type(x), x)
+
+
+def intern_ast(node):
+    """Return the canonical instance of an expression AST tuple.
+
+    Children are interned first, so structurally identical subtrees map to
+    the same object. Nodes holding unhashable leaves are returned unchanged.
+    """
+    if type(node) is not tuple:
+        return node
+    if id(node) in _INTERN_IDS:
+        return node
+    try:
+        key = tuple(_intern_key(x) for x in node)
+        canon = _INTERN.get(key)
+    except TypeError:
+        return node
+    if canon is None:
+        if any(type(x) is tuple for x in node):
+            node = tuple(intern_ast(x) for x in node)
+        _INTERN[key] = canon = node
+        _INTERN_IDS[id(canon)] = canon
+    return canon
+
+
 def _mk_name(n):
-    return ('name', n)
+    return intern_ast(('name', n))
 
 
 def _mk_num(v):
-    return ('num', v)
+    return intern_ast(('num', v))
+
+
+# Conditional jumps taken to the true label after COMP, per comparison
+_CMP_TMPL = {
+    '==': ('SICERO {}',),
+    '!=': ('SINCERO {}',),
+    '<': ('SINEG {}',),
+    '<=': ('SICERO {}', 'SINEG {}'),
+    '>': ('SIPOS {}',),
+    '>=': ('SICERO {}', 'SIPOS {}'),
+}
 
 
 def _gen_cmp_asm(ast, true_label, end_label):
     _, left, op, right = ast
     lines = []
+    temps = []
     if left[0] == 'name':
         r_left = ctx.reg_for(left[1])
     else:
-        r_left = ctx.new_temp()
+        r_left = ctx.acquire_temp()
+        temps.append(r_left)
         lines.append(f"ICARGA R{r_left} {left[1]}")
 
     if right[0] == 'name':
         r_right = ctx.reg_for(right[1])
     else:
-        r_right = ctx.new_temp()
+        r_right = ctx.acquire_temp()
+        temps.append(r_right)
         lines.append(f"ICARGA R{r_right} {right[1]}")
 
     lines.append(f"COMP R{r_left}, R{r_right}")
-    if op == '==':
-        lines.append(f"SICERO {true_label}")
-    elif op == '!=':
-        lines.append(f"SINCERO {true_label}")
-    elif op == '<':
-        lines.append(f"SINEG {true_label}")
-    elif op == '<=':
-        lines.append(f"SICERO {true_label}")
-        lines.append(f"SINEG {true_label}")
-    elif op == '>':
-        lines.append(f"SIPOS {true_label}")
-    elif op == '>=':
-        lines.append(f"SICERO {true_label}")
-        lines.append(f"SIPOS {true_label}")
+    for r in temps:
+        ctx.release_temp(r)
+    lines.extend(tmpl.format(true_label) for tmpl in _CMP_TMPL.get(op, ()))
     lines.append(f"SALTA {end_label}")
     return '\n'.join(lines)
 
@@ -244,26 +417,30 @@ def generate_cond_asm(ast, true_label, end_label):
 def _preprocess_indentation(text: str) -> str:
     out_lines: List[str] = []
     indent_stack = [0]
-    prev_stripped = ''
+    prev_begin = False
     for raw in text.splitlines():
-        if not raw.strip():
+        stripped = raw.lstrip()
+        if not stripped:
             out_lines.append(raw)
             continue
-        leading = len(raw) - len(raw.lstrip(' '))
-        next_stripped = raw.lstrip().lower()
+        # Only leading spaces count as indentation; the (rare) lines that
+        # also start with tabs or other whitespace need a second strip
+        leading = len(raw) - len(stripped)
+        if leading and raw.count(' ', 0, leading) != leading:
+            leading = len(raw) - len(raw.lstrip(' '))
         if leading > indent_stack[-1]:
             indent_stack.append(leading)
-            if not prev_stripped.startswith('begin'):
+            if not prev_begin:
                 out_lines.append('BEGIN')
-        skip_one_end = raw.lstrip().lower().startswith('end')
+        skip_one_end = stripped[:3].lower().startswith('end')
         while leading < indent_stack[-1]:
             indent_stack.pop()
             if skip_one_end:
                 skip_one_end = False
                 continue
             out_lines.append('END')
-        out_lines.append(raw.lstrip())
-        prev_stripped = next_stripped
+        out_lines.append(stripped)
+        prev_begin = stripped[:5].lower().startswith('begin')
     while len(indent_stack) > 1:
         indent_stack.pop()
         out_lines.append('END')
@@ -283,83 +460,236 @@ precedence = (
 )
 
 
-def generate_expr_asm(ast, target_reg: int) -> list:
-    lines = []
+# Instruction templates for binary expression operators: target, operand
+_BINOP_TMPL = {
+    '+': 'SUMA R{}, R{}',
+    '-': 'RESTA R{}, R{}',
+    '*': 'MULT R{}, R{}',
+}
+
+
+# ICARGA carries a signed 32-bit immediate
+_IMM_MIN = -(1 << 31)
+_IMM_MAX = (1 << 31) - 1
+_FOLD_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+}
+
+
+def _is_imm(ast) -> bool:
+    return ast[0] == 'num' and type(ast[1]) is int and _IMM_MIN <= ast[1] <= _IMM_MAX
+
+
+def _fold(ast):
+    """
+    Fold constant binop/uminus subtrees into ('num', v). Only integer
+    operands are folded, and only when the result still fits an ICARGA
+    immediate, so the folded load yields the same register value as the
+    unfolded instruction sequence.
+    """
     kind = ast[0]
-    if kind == 'num':
-        lines.append(f"ICARGA R{target_reg} {ast[1]}")
-        return lines
-    if kind == 'name':
-        src_reg = ctx.reg_for(ast[1])
-        if src_reg != target_reg:
-            lines.append(f"COPIA R{target_reg}, R{src_reg}")
-        return lines
-    if kind == 'memref':
-        addr = ast[1]
-        lines.append(f"CARGA R{target_reg}, M[{addr}]")
-        return lines
-    if kind == 'memref_label':
-        label = ast[1]
-        offset = ast[2]
-        lines.append(f"CARGA R{target_reg}, M[{label}+{offset}]")
-        return lines
+    if kind == 'binop':
+        left = _fold(ast[2])
+        right = _fold(ast[3])
+        fn = _FOLD_OPS.get(ast[1])
+        if fn is not None and _is_imm(left) and _is_imm(right):
+            value = fn(left[1], right[1])
+            if _IMM_MIN <= value <= _IMM_MAX:
+                return intern_ast(('num', value))
+        if left is ast[2] and right is ast[3]:
+            return ast
+        return intern_ast(('binop', ast[1], left, right))
+    if kind == 'uminus':
+        inner = _fold(ast[1])
+        if _is_imm(inner) and -inner[1] <= _IMM_MAX:
+            return intern_ast(('num', -inner[1]))
+        if inner is ast[1]:
+            return ast
+        return intern_ast(('uminus', inner))
     if kind == 'memref_indirect':
-        # ast = ('memref_indirect', name, offset_ast)
-        name = ast[1]
-        offset_ast = ast[2]
+        offset_ast = _fold(ast[2])
+        if offset_ast is ast[2]:
+            return ast
+        return intern_ast(('memref_indirect', ast[1], offset_ast))
+    return ast
+
+
+def _cse_entry(ast):
+    """
+    Cache key and read set of a binop/uminus subtree that only reads numbers
+    and variables, or None when it touches memory or input.
+    """
+    names = set()
+    pending = [ast]
+    while pending:
+        node = pending.pop()
+        kind = node[0]
+        if kind == 'name':
+            names.add(node[1])
+        elif kind == 'binop':
+            pending.append(node[2])
+            pending.append(node[3])
+        elif kind == 'uminus':
+            pending.append(node[1])
+        elif kind != 'num':
+            return None
+    node = intern_ast(ast)
+    if id(node) not in _INTERN_IDS:
+        return None
+    return id(node), frozenset(names)
+
+
+def generate_expr_asm(ast, target_reg: int, hold: bool = False, out: list = None) -> list:
+    """
+    Emit code computing ast into target_reg. With hold=True the caller
+    leaves target_reg untouched afterwards, so later occurrences of the same
+    subexpression in this statement copy it instead of recomputing it.
+    Lines are appended to out when given (and out is returned), so a
+    statement can collect several expressions into one list.
+    """
+    if out is None:
+        out = []
+    ctx.forget_reg(target_reg)
+    ctx.expr_dest = target_reg
+    _generate_expr_asm(_fold(ast), target_reg, out, hold)
+    return out
+
+
+def _emit_num(ast, target_reg: int, out: list) -> None:
+    out.append(f"ICARGA R{target_reg} {ast[1]}")
+
+
+def _emit_name(ast, target_reg: int, out: list) -> None:
+    src_reg = ctx.reg_for(ast[1])
+    if src_reg != target_reg:
+        out.append(f"COPIA R{target_reg}, R{src_reg}")
+
+
+def _emit_memref(ast, target_reg: int, out: list) -> None:
+    addr = ast[1]
+    out.append(f"CARGA R{target_reg}, M[{addr}]")
+
+
+def _emit_memref_label(ast, target_reg: int, out: list) -> None:
+    label = ast[1]
+    offset = ast[2]
+    out.append(f"CARGA R{target_reg}, M[{label}+{offset}]")
+
+
+def _emit_memref_indirect(ast, target_reg: int, out: list) -> None:
+    # ast = ('memref_indirect', name, offset_ast)
+    name = ast[1]
+    offset_ast = ast[2]
+    if offset_ast[0] == 'num':
+        # constant (folded) offset: direct load like memref_label
+        out.append(f"CARGA R{target_reg}, M[{name}+{offset_ast[1]}]")
+        return
+    with ctx.temp() as off_temp, ctx.temp() as base_temp:
         # compute offset into a temp
-        off_temp = ctx.new_temp()
-        lines.extend(generate_expr_asm(offset_ast, off_temp))
+        _generate_expr_asm(offset_ast, off_temp, out, hold=True)
         # load base address label into a temp
-        base_temp = ctx.new_temp()
-        lines.append(f"ICARGA R{base_temp} {name}")
+        out.append(f"ICARGA R{base_temp} {name}")
         # add offset to base
-        lines.append(f"SUMA R{base_temp}, R{off_temp}")
+        out.append(f"SUMA R{base_temp}, R{off_temp}")
         # indirect load into target register
-        lines.append(f"CARGAIND R{target_reg} R{base_temp}")
-        return lines
-    if kind == 'input':
-        es_addr = __import__('constants').E_S_RANGE[0]
-        lines.append(f"CARGA R{target_reg}, M[{es_addr}]")
-        return lines
-    if kind == 'uminus':
-        inner = ast[1]
-        lines.extend(generate_expr_asm(inner, target_reg))
-        temp = ctx.new_temp()
-        lines.append(f"ICARGA R{temp} -1")
-        lines.append(f"MULT R{target_reg}, R{temp}")
-        return lines
-    if kind == 'binop':
-        op = ast[1]
-        left = ast[2]
-        right = ast[3]
-        lines.extend(generate_expr_asm(left, target_reg))
-        temp = ctx.new_temp()
-        lines.extend(generate_expr_asm(right, temp))
-        if op == '+':
-            lines.append(f"SUMA R{target_reg}, R{temp}")
-        elif op == '-':
-            lines.append(f"RESTA R{target_reg}, R{temp}")
-        elif op == '*':
-            lines.append(f"MULT R{target_reg}, R{temp}")
-        else:
+        out.append(f"CARGAIND R{target_reg} R{base_temp}")
+
+
+def _emit_input(ast, target_reg: int, out: list) -> None:
+    out.append(f"CARGA R{target_reg}, M[{_ES_ADDR}]")
+
+
+def _emit_uminus(ast, target_reg: int, out: list) -> None:
+    _generate_expr_asm(ast[1], target_reg, out)
+    with ctx.temp() as temp:
+        out.append(f"ICARGA R{temp} -1")
+        out.append(f"MULT R{target_reg}, R{temp}")
+
+
+def _emit_binop(ast, target_reg: int, out: list) -> None:
+    op = ast[1]
+    left = ast[2]
+    right = ast[3]
+    _generate_expr_asm(left, target_reg, out)
+    with ctx.temp() as temp:
+        _generate_expr_asm(right, temp, out, hold=True)
+        tmpl = _BINOP_TMPL.get(op)
+        if tmpl is None:
             raise SyntaxError(f"Unsupported binary op in expression: {op}")
-        return lines
-    raise SyntaxError(f"Unknown expr AST node: {ast}")
+        out.append(tmpl.format(target_reg, temp))
+
+
+# Code emitters per expression AST kind
+_EXPR_EMITTERS = {
+    'num': _emit_num,
+    'name': _emit_name,
+    'memref': _emit_memref,
+    'memref_label': _emit_memref_label,
+    'memref_indirect': _emit_memref_indirect,
+    'input': _emit_input,
+    'uminus': _emit_uminus,
+    'binop': _emit_binop,
+}
+# Kinds whose pure instances go through the per-statement CSE cache
+_CSE_KINDS = frozenset({'binop', 'uminus'})
+
+
+def _generate_expr_asm(ast, target_reg: int, out: list, hold: bool = False) -> None:
+    kind = ast[0]
+    emit = _EXPR_EMITTERS.get(kind)
+    if emit is None:
+        raise SyntaxError(f"Unknown expr AST node: {ast}")
+    cse = _cse_entry(ast) if kind in _CSE_KINDS else None
+    if cse is None:
+        emit(ast, target_reg, out)
+        return
+    src_reg = ctx.lookup_expr(cse[0])
+    if src_reg is not None:
+        if src_reg != target_reg:
+            out.append(f"COPIA R{target_reg}, R{src_reg}")
+        return
+    emit(ast, target_reg, out)
+    if hold:
+        ctx.remember_expr(*cse, target_reg)
 
 
 def p_program(p):
     'program : stmts'
-    p[0] = '\n'.join(p[1])
+    # Statements produce lines (block statements a nested list holding their
+    # body); the flat list is joined exactly once by compile_high_level
+    p[0] = _flatten_lines(p[1])
+
+
+def _flatten_lines(items) -> List[str]:
+    lines: List[str] = []
+    pending = [iter(items)]
+    while pending:
+        for item in pending[-1]:
+            if isinstance(item, list):
+                pending.append(iter(item))
+                break
+            lines.append(item)
+        else:
+            pending.pop()
+    return lines
 
 
 def p_stmts_multiple(p):
-    'stmts : stmt stmts'
-    p[0] = [p[1]] + p[2]
+    'stmts : stmts stmt'
+    # Cached subexpressions never outlive the statement that computed them
+    if ctx is not None:
+        ctx.clear_expr_cache()
+    # Left recursion: the list grows in place instead of being re-copied
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_stmts_empty(p):
     'stmts : '
+    if ctx is not None:
+        ctx.clear_expr_cache()
     p[0] = []
 
 
@@ -428,7 +758,7 @@ def p_stmt_assignment_expr(p):
     # Modo compilador: generar ensamblador
     reg_dst = ctx.reg_for(dst)
     lines = generate_expr_asm(ast, reg_dst)
-    p[0] = '\n'.join(lines)
+    p[0] = lines
 
 
 def p_stmt_assignment_expr_assignop(p):
@@ -439,7 +769,7 @@ def p_stmt_assignment_expr_assignop(p):
         raise RuntimeError("Parser context not initialized")
     reg_dst = ctx.reg_for(dst)
     lines = generate_expr_asm(ast, reg_dst)
-    p[0] = '\n'.join(lines)
+    p[0] = lines
 
 
 def p_stmt_register_assign(p):
@@ -451,7 +781,7 @@ def p_stmt_register_assign(p):
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
     lines = generate_expr_asm(ast, reg)
-    p[0] = '\n'.join(lines)
+    p[0] = lines
 
 
 def p_stmt_register_assign_op(p):
@@ -463,27 +793,27 @@ def p_stmt_register_assign_op(p):
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
     lines = generate_expr_asm(ast, reg)
-    p[0] = '\n'.join(lines)
+    p[0] = lines
 
 
 def p_expr_binop(p):
     'expr : expr PLUS expr'
-    p[0] = ('binop', '+', p[1], p[3])
+    p[0] = intern_ast(('binop', '+', p[1], p[3]))
 
 
 def p_expr_binop_sub(p):
     'expr : expr MINUS expr'
-    p[0] = ('binop', '-', p[1], p[3])
+    p[0] = intern_ast(('binop', '-', p[1], p[3]))
 
 
 def p_expr_binop_mul(p):
     'expr : expr TIMES expr'
-    p[0] = ('binop', '*', p[1], p[3])
+    p[0] = intern_ast(('binop', '*', p[1], p[3]))
 
 
 def p_expr_uminus(p):
     'expr : MINUS expr %prec UMINUS'
-    p[0] = ('uminus', p[2])
+    p[0] = intern_ast(('uminus', p[2]))
 
 
 def p_expr_group(p):
@@ -493,24 +823,24 @@ def p_expr_group(p):
 
 def p_expr_number(p):
     'expr : NUMBER'
-    p[0] = ('num', p[1])
+    p[0] = intern_ast(('num', p[1]))
 
 
 def p_expr_name(p):
     'expr : NAME'
-    p[0] = ('name', p[1])
+    p[0] = intern_ast(('name', p[1]))
 
 
 def p_expr_memref(p):
     'expr : MEMREF'
-    p[0] = ('memref', p[1])
+    p[0] = intern_ast(('memref', p[1]))
 
 
 def p_expr_array_access_const(p):
     'expr : NAME LBRACKET NUMBER RBRACKET'
     name = p[1]
     idx = p[3]
-    p[0] = ('memref_label', name, idx)
+    p[0] = intern_ast(('memref_label', name, idx))
 
 
 def p_expr_array_access_const_2d(p):
@@ -527,7 +857,7 @@ def p_expr_array_access_const_2d(p):
         # allow out-of-range but keep computed offset
         pass
     offset = i * cols + j
-    p[0] = ('memref_label', name, offset)
+    p[0] = intern_ast(('memref_label', name, offset))
 
 
 def p_expr_array_access(p):
@@ -535,7 +865,7 @@ def p_expr_array_access(p):
     name = p[1]
     offset_ast = p[3]
     # produce an indirect memref AST: base label + runtime offset
-    p[0] = ('memref_indirect', name, offset_ast)
+    p[0] = intern_ast(('memref_indirect', name, offset_ast))
 
 
 def p_expr_array_access_2d(p):
@@ -555,7 +885,30 @@ def p_expr_array_access_2d(p):
     else:
         # Use static column count: offset = i * cols + j
         offset_ast = ('binop', '+', ('binop', '*', i_ast, ('num', cols)), j_ast)
-    p[0] = ('memref_indirect', name, offset_ast)
+    p[0] = intern_ast(('memref_indirect', name, offset_ast))
+
+
+def _emit_indirect_store(name, offset_ast, value_ast) -> list:
+    """
+    Emit `name[offset] = value`: the value goes into a temp and is stored at
+    the address base label + offset. A constant offset is stored directly
+    with GUARD instead of computing the address at run time.
+    """
+    with ctx.temp() as val_temp:
+        lines = generate_expr_asm(value_ast, val_temp)
+        offset_ast = _fold(offset_ast)
+        if offset_ast[0] == 'num':
+            lines.append(f"GUARD R{val_temp}, M[{name}+{offset_ast[1]}]")
+            return lines
+        with ctx.temp() as off_temp, ctx.temp() as base_temp:
+            # compute offset into a temp
+            generate_expr_asm(offset_ast, off_temp, hold=True, out=lines)
+            # load base address label into a temp and add offset
+            lines.append(f"ICARGA R{base_temp} {name}")
+            lines.append(f"SUMA R{base_temp}, R{off_temp}")
+            # store value into memory at address in base_temp
+            lines.append(f"GUARDIND R{val_temp} R{base_temp}")
+    return lines
 
 
 def p_stmt_array_assign_const(p):
@@ -565,10 +918,10 @@ def p_stmt_array_assign_const(p):
     ast = p[6]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, temp)
-    lines.append(f"GUARD R{temp}, M[{name}+{idx}]")
-    p[0] = '\n'.join(lines)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{name}+{idx}]")
+    p[0] = lines
 
 
 def p_stmt_array_assign_const_2d(p):
@@ -584,10 +937,10 @@ def p_stmt_array_assign_const_2d(p):
     ast = p[9]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, temp)
-    lines.append(f"GUARD R{temp}, M[{name}+{offset}]")
-    p[0] = '\n'.join(lines)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{name}+{offset}]")
+    p[0] = lines
 
 
 def p_stmt_array_assign_expr(p):
@@ -597,19 +950,7 @@ def p_stmt_array_assign_expr(p):
     ast = p[6]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    # compute value into a temp
-    val_temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, val_temp)
-    # compute offset into temp
-    off_temp = ctx.new_temp()
-    lines.extend(generate_expr_asm(offset_ast, off_temp))
-    # load base address label into a temp and add offset
-    base_temp = ctx.new_temp()
-    lines.append(f"ICARGA R{base_temp} {name}")
-    lines.append(f"SUMA R{base_temp}, R{off_temp}")
-    # store value into memory at address in base_temp
-    lines.append(f"GUARDIND R{val_temp} R{base_temp}")
-    p[0] = '\n'.join(lines)
+    p[0] = _emit_indirect_store(name, offset_ast, ast)
 
 
 def p_stmt_array_assign_expr_2d(p):
@@ -624,22 +965,13 @@ def p_stmt_array_assign_expr_2d(p):
     rows, cols = dims[0], dims[1]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    # value
-    val_temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, val_temp)
     # offset = i * cols + j (use dynamic column variable if available)
     col_var = array_col_var.get(name)
     if col_var:
         off_ast = ('binop', '+', ('binop', '*', i_ast, ('name', col_var)), j_ast)
     else:
         off_ast = ('binop', '+', ('binop', '*', i_ast, ('num', cols)), j_ast)
-    off_temp = ctx.new_temp()
-    lines.extend(generate_expr_asm(off_ast, off_temp))
-    base_temp = ctx.new_temp()
-    lines.append(f"ICARGA R{base_temp} {name}")
-    lines.append(f"SUMA R{base_temp}, R{off_temp}")
-    lines.append(f"GUARDIND R{val_temp} R{base_temp}")
-    p[0] = '\n'.join(lines)
+    p[0] = _emit_indirect_store(name, off_ast, ast)
 
 
 def p_stmt_array_assign_expr_assignop(p):
@@ -649,15 +981,7 @@ def p_stmt_array_assign_expr_assignop(p):
     ast = p[6]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    val_temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, val_temp)
-    off_temp = ctx.new_temp()
-    lines.extend(generate_expr_asm(offset_ast, off_temp))
-    base_temp = ctx.new_temp()
-    lines.append(f"ICARGA R{base_temp} {name}")
-    lines.append(f"SUMA R{base_temp}, R{off_temp}")
-    lines.append(f"GUARDIND R{val_temp} R{base_temp}")
-    p[0] = '\n'.join(lines)
+    p[0] = _emit_indirect_store(name, offset_ast, ast)
 
 
 def p_stmt_array_assign_expr_assignop_2d(p):
@@ -672,16 +996,8 @@ def p_stmt_array_assign_expr_assignop_2d(p):
     rows, cols = dims[0], dims[1]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    val_temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, val_temp)
     off_ast = ('binop', '+', ('binop', '*', i_ast, ('num', cols)), j_ast)
-    off_temp = ctx.new_temp()
-    lines.extend(generate_expr_asm(off_ast, off_temp))
-    base_temp = ctx.new_temp()
-    lines.append(f"ICARGA R{base_temp} {name}")
-    lines.append(f"SUMA R{base_temp}, R{off_temp}")
-    lines.append(f"GUARDIND R{val_temp} R{base_temp}")
-    p[0] = '\n'.join(lines)
+    p[0] = _emit_indirect_store(name, off_ast, ast)
 
 
 def p_stmt_array_assign_const_assignop(p):
@@ -691,10 +1007,10 @@ def p_stmt_array_assign_const_assignop(p):
     ast = p[6]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, temp)
-    lines.append(f"GUARD R{temp}, M[{name}+{idx}]")
-    p[0] = '\n'.join(lines)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{name}+{idx}]")
+    p[0] = lines
 
 
 def p_stmt_array_assign_const_assignop_2d(p):
@@ -710,10 +1026,10 @@ def p_stmt_array_assign_const_assignop_2d(p):
     ast = p[10]
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    temp = ctx.new_temp()
-    lines = generate_expr_asm(ast, temp)
-    lines.append(f"GUARD R{temp}, M[{name}+{offset}]")
-    p[0] = '\n'.join(lines)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{name}+{offset}]")
+    p[0] = lines
 
 
 def p_stmt_type_decl(p):
@@ -722,7 +1038,7 @@ def p_stmt_type_decl(p):
     fields = p[4]
     # Store fields with visibility info (if any)
     normalized = _normalize_fields(fields)
-    type_table[typename] = normalized
+    _register_type(typename, normalized)
     
     # Acción semántica YACC: registrar tipo en intérprete
     if INTERPRETER_MODE:
@@ -738,7 +1054,7 @@ def p_stmt_struct_decl(p):
     typename = p[2]
     fields = p[4]
     normalized = _normalize_fields(fields)
-    type_table[typename] = normalized
+    _register_type(typename, normalized)
     
     # Acción semántica YACC
     if INTERPRETER_MODE:
@@ -753,7 +1069,7 @@ def p_stmt_record_decl(p):
     'stmt : RECORD NAME LBRACE fields RBRACE'
     typename = p[2]
     fields = p[4]
-    type_table[typename] = _normalize_fields(fields)
+    _register_type(typename, _normalize_fields(fields))
     p[0] = f"; RECORD {typename} with fields {fields}"
 
 
@@ -762,7 +1078,7 @@ def p_stmt_class_decl(p):
     typename = p[2]
     fields = p[4]
     normalized = _normalize_fields(fields)
-    type_table[typename] = normalized
+    _register_type(typename, normalized)
     
     # Acción semántica YACC
     if INTERPRETER_MODE:
@@ -780,8 +1096,9 @@ def p_fields_single(p):
 
 
 def p_fields_multiple(p):
-    'fields : NAME COMMA fields'
-    p[0] = [p[1]] + p[3]
+    'fields : fields COMMA NAME'
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_fields_with_visibility(p):
@@ -845,12 +1162,13 @@ def p_stmt_import_all(p):
 
 
 def p_fields_visibility_multiple(p):
-    '''fields : PRIVATE COLON NAME COMMA fields
-              | PUBLIC COLON NAME COMMA fields
-              | PROTECTED COLON NAME COMMA fields'''
-    visibility = p[1]
-    field_name = p[3]
-    p[0] = [f"{visibility}_{field_name}"] + p[5]
+    '''fields : fields COMMA PRIVATE COLON NAME
+              | fields COMMA PUBLIC COLON NAME
+              | fields COMMA PROTECTED COLON NAME'''
+    visibility = p[3]
+    field_name = p[5]
+    p[1].append(f"{visibility}_{field_name}")
+    p[0] = p[1]
 
 
 def p_stmt_var_typed(p):
@@ -861,9 +1179,8 @@ def p_stmt_var_typed(p):
         raise SyntaxError(f"Unknown type '{typename}' for variable {varname}")
     fields = type_table[typename]
     size = len(fields)
-    data_vals = ' '.join(['0'] * size)
     _data_section.append(f"{varname}:")
-    _data_section.append(f".data {data_vals}")
+    _data_section.append(f".data {size}*0")
     p[0] = f"; VAR {varname} : {typename} -> {size} words"
 
 
@@ -890,9 +1207,8 @@ def p_stmt_var_typed_init(p):
     
     # Crear la variable en .data section (inicialmente en 0)
     size = len(fields)
-    data_vals = ' '.join(['0'] * size)
     _data_section.append(f"{varname}:")
-    _data_section.append(f".data {data_vals}")
+    _data_section.append(f".data {size}*0")
     
     # Generar código para inicializar cada campo
     if ctx is None:
@@ -900,11 +1216,11 @@ def p_stmt_var_typed_init(p):
     
     lines = [f"; VAR {varname} : {typename} -> {size} words with initializers"]
     for i, init_expr in enumerate(init_values):
-        temp = ctx.new_temp()
-        lines.extend(generate_expr_asm(init_expr, temp))
-        lines.append(f"GUARD R{temp}, M[{varname}+{i}]")
+        with ctx.temp() as temp:
+            generate_expr_asm(init_expr, temp, out=lines)
+            lines.append(f"GUARD R{temp}, M[{varname}+{i}]")
     
-    p[0] = '\n'.join(lines)
+    p[0] = lines
 
 
 def p_init_list_single(p):
@@ -913,8 +1229,9 @@ def p_init_list_single(p):
 
 
 def p_init_list_multiple(p):
-    'init_list : expr COMMA init_list'
-    p[0] = [p[1]] + p[3]
+    'init_list : init_list COMMA expr'
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_stmt_field_assign(p):
@@ -932,23 +1249,12 @@ def p_stmt_field_assign(p):
         value = interp.evaluate_expression(ast)
         interp.set_field(var, field, value)
     
-    # Find type and validate access
-    found = False
-    for tname, fields in type_table.items():
-        field_info = _get_field_info(tname, field)
-        if field_info:
-            # Found the field, check access (external context)
-            _check_field_access(tname, field, "external")
-            offset = field_info['offset']
-            temp = ctx.new_temp()
-            lines = generate_expr_asm(ast, temp)
-            lines.append(f"GUARD R{temp}, M[{var}+{offset}]")
-            p[0] = '\n'.join(lines)
-            found = True
-            break
-    
-    if not found:
-        raise SyntaxError(f"Unknown field '{field}' for variable {var}")
+    # Find type and validate access (external context)
+    offset = _lookup_field(var, field)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{var}+{offset}]")
+    p[0] = lines
 
 
 def p_stmt_field_assign_assignop(p):
@@ -959,21 +1265,11 @@ def p_stmt_field_assign_assignop(p):
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
     
-    found = False
-    for tname, fields in type_table.items():
-        field_info = _get_field_info(tname, field)
-        if field_info:
-            _check_field_access(tname, field, "external")
-            offset = field_info['offset']
-            temp = ctx.new_temp()
-            lines = generate_expr_asm(ast, temp)
-            lines.append(f"GUARD R{temp}, M[{var}+{offset}]")
-            p[0] = '\n'.join(lines)
-            found = True
-            break
-    
-    if not found:
-        raise SyntaxError(f"Unknown field '{field}' for variable {var}")
+    offset = _lookup_field(var, field)
+    with ctx.temp() as temp:
+        lines = generate_expr_asm(ast, temp)
+        lines.append(f"GUARD R{temp}, M[{var}+{offset}]")
+    p[0] = lines
 
 
 def p_expr_field_access(p):
@@ -984,18 +1280,12 @@ def p_expr_field_access(p):
     # Acción semántica YACC: En modo intérprete, crear AST especial para field_access
     # que será evaluado por evaluate_expression
     if INTERPRETER_MODE:
-        p[0] = ('field_access', var, field)
+        p[0] = intern_ast(('field_access', var, field))
         return
     
     # Find field in known types
-    for tname, fields in type_table.items():
-        field_info = _get_field_info(tname, field)
-        if field_info:
-            _check_field_access(tname, field, "external")
-            offset = field_info['offset']
-            p[0] = ('memref_label', var, offset)
-            return
-    raise SyntaxError(f"Unknown field '{field}' for variable {var}")
+    offset = _lookup_field(var, field)
+    p[0] = intern_ast(('memref_label', var, offset))
 
 
 def p_stmt_while(p):
@@ -1022,7 +1312,7 @@ def p_stmt_while(p):
     out.append(f"RESTA R{regmap[var2]}, R{regmap[var1]}")
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_while_num(p):
@@ -1032,7 +1322,8 @@ def p_stmt_while_num(p):
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
     reg1 = ctx.reg_for(var1)
-    temp = ctx.new_temp()
+    # Compared on every iteration, i.e. live across the body
+    temp = ctx.loop_temp(p[7])
     loop_label = ctx.new_label('loop')
     end_label = ctx.new_label('end')
     a_gt = ctx.new_label('a_gt')
@@ -1051,7 +1342,7 @@ def p_stmt_while_num(p):
     out.append(f"RESTA R{temp}, R{reg1}")
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_para(p):
@@ -1060,6 +1351,21 @@ def p_stmt_para(p):
     p[0] = 'PARA'
 
 
+# One little-endian 64-bit word of string payload
+_WORD = struct.Struct('<Q')
+
+
+def _intern_data(val: int) -> str:
+    """Label of a read-only .data word holding val, emitted once per value."""
+    lbl = _data_pool.get(val)
+    if lbl is None:
+        lbl = ctx.new_label('str')
+        _data_pool[val] = lbl
+        _data_section.append(f"{lbl}:")
+        _data_section.append(f".data {val}")
+    return lbl
+
+
 def p_stmt_print(p):
     'stmt : PRINT LPAREN print_args RPAREN'
     # print_args is a list of items (STRING or expr). We will emit
@@ -1083,25 +1389,20 @@ def p_stmt_print(p):
                 value = interp.evaluate_expression(it[1])
                 output_parts.append(str(value))
         output_line = ' '.join(output_parts)
-        interp.print_output(output_line)
-        print(output_line)
+        interp.emit_output(output_line)
     
     # Modo compilador: generar ensamblador
-    es_addr = __import__('constants').E_S_RANGE[0]
     lines = []
 
     def emit_string_no_nl(s: str):
         # emit string bytes as 8-byte little-endian chunks without adding newline
         bfull = s.encode('utf-8')
-        for i in range(0, len(bfull), 8):
-            chunk = bfull[i:i+8].ljust(8, b'\x00')
-            val = int.from_bytes(chunk, 'little')
-            lbl = ctx.new_label('str')
-            _data_section.append(f"{lbl}:")
-            _data_section.append(f".data {val}")
-            r = ctx.new_temp()
-            lines.append(f"CARGA R{r}, M[{lbl}]")
-            lines.append(f"GUARD R{r}, M[{es_addr}]")
+        bfull += b'\x00' * (-len(bfull) % 8)
+        for (val,) in _WORD.iter_unpack(bfull):
+            lbl = _intern_data(val)
+            with ctx.temp() as r:
+                lines.append(f"CARGA R{r}, M[{lbl}]")
+                lines.append(f"GUARD R{r}, M[{_ES_ADDR}]")
 
     for it in items:
         kind = it[0]
@@ -1113,34 +1414,30 @@ def p_stmt_print(p):
             ast = it[1]
             # Send a numeric marker first: 0xFF followed by 0x4E ('N' for Number)
             # Pattern: 0xFF 0x4E 0x00 ... 0x00 0x02 (last byte = 2 to mark as number prefix)
-            num_marker_lbl = ctx.new_label('str')
-            _data_section.append(f"{num_marker_lbl}:")
             marker_bytes = b'\xFF\x4E\x00\x00\x00\x00\x00\x02'
             marker_val = int.from_bytes(marker_bytes, 'little')
-            _data_section.append(f".data {marker_val}")
-            marker_reg = ctx.new_temp()
-            lines.append(f"CARGA R{marker_reg}, M[{num_marker_lbl}]")
-            lines.append(f"GUARD R{marker_reg}, M[{es_addr}]")
+            num_marker_lbl = _intern_data(marker_val)
+            with ctx.temp() as marker_reg:
+                lines.append(f"CARGA R{marker_reg}, M[{num_marker_lbl}]")
+                lines.append(f"GUARD R{marker_reg}, M[{_ES_ADDR}]")
             # Now send the actual number value
-            r = ctx.new_temp()
-            lines.extend(generate_expr_asm(ast, r))
-            lines.append(f"GUARD R{r}, M[{es_addr}]")
+            with ctx.temp() as r:
+                generate_expr_asm(ast, r, out=lines)
+                lines.append(f"GUARD R{r}, M[{_ES_ADDR}]")
         else:
             raise SyntaxError(f"Unknown print item kind: {kind}")
 
     # Finally, append a newline character
     # Use a unique marker: newline followed by null to distinguish from numeric 10
-    nl_lbl = ctx.new_label('str')
-    _data_section.append(f"{nl_lbl}:")
     # Encode newline as part of a string (with trailing nulls) so it's 
     # distinguishable from the numeric value 10
     newline_bytes = b'\n\x00\x00\x00\x00\x00\x00\x01'  # Last byte = 1 to mark as string
     newline_val = int.from_bytes(newline_bytes, 'little')
-    _data_section.append(f".data {newline_val}")
-    tmp = ctx.new_temp()
-    lines.append(f"CARGA R{tmp}, M[{nl_lbl}]")
-    lines.append(f"GUARD R{tmp}, M[{es_addr}]")
-    p[0] = '\n'.join(lines)
+    nl_lbl = _intern_data(newline_val)
+    with ctx.temp() as tmp:
+        lines.append(f"CARGA R{tmp}, M[{nl_lbl}]")
+        lines.append(f"GUARD R{tmp}, M[{_ES_ADDR}]")
+    p[0] = lines
 
 
 def p_print_args_single(p):
@@ -1149,8 +1446,9 @@ def p_print_args_single(p):
 
 
 def p_print_args_multiple(p):
-    'print_args : print_arg COMMA print_args'
-    p[0] = [p[1]] + p[3]
+    'print_args : print_args COMMA print_arg'
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_print_arg_string(p):
@@ -1188,7 +1486,7 @@ def p_stmt_while_lt(p):
     out.extend(p[7])
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_while_lt_num(p):
@@ -1198,7 +1496,8 @@ def p_stmt_while_lt_num(p):
     var1 = p[2]
     imm = p[4]
     reg1 = ctx.reg_for(var1)
-    temp = ctx.new_temp()
+    # Compared on every iteration, i.e. live across the body
+    temp = ctx.loop_temp(p[7])
     loop_label = ctx.new_label('loop')
     end_label = ctx.new_label('end')
     out = []
@@ -1210,7 +1509,7 @@ def p_stmt_while_lt_num(p):
     out.extend(p[7])
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_cond_and(p):
@@ -1292,17 +1591,13 @@ def p_stmt_if_cond(p):
     'stmt : IF cond COLON BEGIN stmts END'
     if ctx is None:
         raise RuntimeError("Parser context not initialized")
-    cond_ast = p[2]
-    true_label = ctx.new_label('if_true')
-    end_label = ctx.new_label('if_end')
-    pre = generate_cond_asm(cond_ast, true_label, end_label)
-    out = []
-    if pre:
-        out.append(pre)
-    out.append(f"{true_label}:")
-    out.extend(p[5])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    new_label = ctx.new_label
+    true_label = new_label('if_true')
+    end_label = new_label('if_end')
+    pre = generate_cond_asm(p[2], true_label, end_label)
+    out = [pre] if pre else []
+    out += [f"{true_label}:", *p[5], f"{end_label}:"]
+    p[0] = out
 
 
 def p_stmt_while_cond(p):
@@ -1320,7 +1615,7 @@ def p_stmt_while_cond(p):
     out.extend(p[5])
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_while_gt(p):
@@ -1345,7 +1640,7 @@ def p_stmt_while_gt(p):
     out.extend(p[7])
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_while_gt_num(p):
@@ -1355,7 +1650,8 @@ def p_stmt_while_gt_num(p):
     var1 = p[2]
     imm = p[4]
     reg1 = ctx.reg_for(var1)
-    temp = ctx.new_temp()
+    # Compared on every iteration, i.e. live across the body
+    temp = ctx.loop_temp(p[7])
     loop_label = ctx.new_label('loop')
     end_label = ctx.new_label('end')
     a_gt = ctx.new_label('a_gt')
@@ -1371,7 +1667,7 @@ def p_stmt_while_gt_num(p):
     out.extend(p[7])
     out.append(f"SALTA {loop_label}")
     out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_stmt_var_decl(p):
@@ -1387,10 +1683,10 @@ def p_stmt_array_decl(p):
     'stmt : VAR NAME LBRACKET NUMBER RBRACKET'
     name = p[2]
     size = p[4]
-    zeros = ' '.join(['0'] * int(size))
     # register as 1-D array
     array_dims[name] = [int(size)]
-    p[0] = f"{name}:\n.data {zeros}"
+    # run-length form: no O(size) string at compile time
+    p[0] = f"{name}:\n.data {int(size)}*0"
 
 
 def p_stmt_array_decl_2d(p):
@@ -1399,22 +1695,21 @@ def p_stmt_array_decl_2d(p):
     r = int(p[4])
     c = int(p[7])
     size = r * c
-    zeros = ' '.join(['0'] * int(size))
     # register as 2-D array with dimensions [rows, cols]
     array_dims[name] = [r, c]
-    p[0] = f"{name}:\n.data {zeros}"
+    p[0] = f"{name}:\n.data {size}*0"
 
 
 def p_stmt_proc_def(p):
     'stmt : PROC NAME LPAREN params RPAREN COLON BEGIN stmts END'
     name = p[2]
-    body = p[8]
-    out = []
-    out.append(f"{name}:")
-    out.extend(body)
-    if not out or not out[-1].strip().upper().startswith('VUELVE'):
+    # Block statements nest their bodies as lists: flatten so the last
+    # item is the procedure's last line
+    out = [f"{name}:"]
+    out.extend(_flatten_lines(p[8]))
+    if not out[-1].strip().upper().startswith('VUELVE'):
         out.append('VUELVE')
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_params(p):
@@ -1441,9 +1736,9 @@ def p_stmt_call(p):
     out = []
     for i, a in enumerate(args):
         targ = ctx.reg_start + i
-        out.extend(generate_expr_asm(a, targ))
+        generate_expr_asm(a, targ, out=out)
     out.append(f"LLAMA {name}")
-    p[0] = '\n'.join(out)
+    p[0] = out
 
 
 def p_args(p):
@@ -1463,106 +1758,111 @@ def p_args_more(p):
 
 def p_stmt_if(p):
     'stmt : IF NAME GT NAME COLON BEGIN stmts END'
-    if ctx is None:
+    c = ctx
+    if c is None:
         raise RuntimeError("Parser context not initialized")
-    left = p[2]
-    right = p[4]
-    reg_left = ctx.reg_for(left)
-    reg_right = ctx.reg_for(right)
-    true_label = ctx.new_label('if_true')
-    end_label = ctx.new_label('if_end')
-    out = []
-    out.append(f"COMP R{reg_left}, R{reg_right}")
-    out.append(f"SIPOS {true_label}")
-    out.append(f"SALTA {end_label}")
-    out.append(f"{true_label}:")
-    out.extend(p[7])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    reg_for = c.reg_for
+    new_label = c.new_label
+    reg_left = reg_for(p[2])
+    reg_right = reg_for(p[4])
+    true_label = new_label('if_true')
+    end_label = new_label('if_end')
+    p[0] = [
+        f"COMP R{reg_left}, R{reg_right}",
+        f"SIPOS {true_label}",
+        f"SALTA {end_label}",
+        f"{true_label}:",
+        *p[7],
+        f"{end_label}:",
+    ]
 
 
 def p_stmt_if_eq(p):
     'stmt : IF NAME EQEQ NAME COLON BEGIN stmts END'
-    if ctx is None:
+    c = ctx
+    if c is None:
         raise RuntimeError("Parser context not initialized")
-    left = p[2]
-    right = p[4]
-    reg_left = ctx.reg_for(left)
-    reg_right = ctx.reg_for(right)
-    true_label = ctx.new_label('if_true')
-    end_label = ctx.new_label('if_end')
-    out = []
-    out.append(f"COMP R{reg_left}, R{reg_right}")
-    out.append(f"SICERO {true_label}")
-    out.append(f"SALTA {end_label}")
-    out.append(f"{true_label}:")
-    out.extend(p[7])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    reg_for = c.reg_for
+    new_label = c.new_label
+    reg_left = reg_for(p[2])
+    reg_right = reg_for(p[4])
+    true_label = new_label('if_true')
+    end_label = new_label('if_end')
+    p[0] = [
+        f"COMP R{reg_left}, R{reg_right}",
+        f"SICERO {true_label}",
+        f"SALTA {end_label}",
+        f"{true_label}:",
+        *p[7],
+        f"{end_label}:",
+    ]
 
 
 def p_stmt_if_le(p):
     'stmt : IF NAME LT NAME COLON BEGIN stmts END'
-    if ctx is None:
+    c = ctx
+    if c is None:
         raise RuntimeError("Parser context not initialized")
-    left = p[2]
-    right = p[4]
-    reg_left = ctx.reg_for(left)
-    reg_right = ctx.reg_for(right)
-    true_label = ctx.new_label('if_true')
-    end_label = ctx.new_label('if_end')
-    out = []
-    out.append(f"COMP R{reg_left}, R{reg_right}")
-    out.append(f"SIPOS {end_label}")
-    out.append(f"{true_label}:")
-    out.extend(p[7])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    reg_for = c.reg_for
+    new_label = c.new_label
+    reg_left = reg_for(p[2])
+    reg_right = reg_for(p[4])
+    true_label = new_label('if_true')
+    end_label = new_label('if_end')
+    p[0] = [
+        f"COMP R{reg_left}, R{reg_right}",
+        f"SIPOS {end_label}",
+        f"{true_label}:",
+        *p[7],
+        f"{end_label}:",
+    ]
 
 
 def p_stmt_if_eq_num(p):
     'stmt : IF NAME EQEQ NUMBER COLON BEGIN stmts END'
-    if ctx is None:
+    c = ctx
+    if c is None:
         raise RuntimeError("Parser context not initialized")
-    left = p[2]
     imm = p[4]
-    reg_left = ctx.reg_for(left)
-    temp = ctx.new_temp()
-    true_label = ctx.new_label('if_true')
-    end_label = ctx.new_label('if_end')
-    out = []
-    out.append(f"ICARGA R{temp} {imm}")
-    out.append(f"COMP R{reg_left}, R{temp}")
-    out.append(f"SICERO {true_label}")
-    out.append(f"SALTA {end_label}")
-    out.append(f"{true_label}:")
-    out.extend(p[7])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    reg_left = c.reg_for(p[2])
+    new_label = c.new_label
+    true_label = new_label('if_true')
+    end_label = new_label('if_end')
+    with c.temp() as temp:
+        out = [f"ICARGA R{temp} {imm}", f"COMP R{reg_left}, R{temp}"]
+    out += [
+        f"SICERO {true_label}",
+        f"SALTA {end_label}",
+        f"{true_label}:",
+        *p[7],
+        f"{end_label}:",
+    ]
+    p[0] = out
 
 
 def p_stmt_if_else(p):
     'stmt : IF NAME GT NAME COLON BEGIN stmts END ELSE COLON BEGIN stmts END'
-    if ctx is None:
+    c = ctx
+    if c is None:
         raise RuntimeError("Parser context not initialized")
-    left = p[2]
-    right = p[4]
-    reg_left = ctx.reg_for(left)
-    reg_right = ctx.reg_for(right)
-    true_label = ctx.new_label('if_true')
-    else_label = ctx.new_label('if_else')
-    end_label = ctx.new_label('if_end')
-    out = []
-    out.append(f"COMP R{reg_left}, R{reg_right}")
-    out.append(f"SIPOS {true_label}")
-    out.append(f"SALTA {else_label}")
-    out.append(f"{true_label}:")
-    out.extend(p[7])
-    out.append(f"SALTA {end_label}")
-    out.append(f"{else_label}:")
-    out.extend(p[12])
-    out.append(f"{end_label}:")
-    p[0] = '\n'.join(out)
+    reg_for = c.reg_for
+    new_label = c.new_label
+    reg_left = reg_for(p[2])
+    reg_right = reg_for(p[4])
+    true_label = new_label('if_true')
+    else_label = new_label('if_else')
+    end_label = new_label('if_end')
+    p[0] = [
+        f"COMP R{reg_left}, R{reg_right}",
+        f"SIPOS {true_label}",
+        f"SALTA {else_label}",
+        f"{true_label}:",
+        *p[7],
+        f"SALTA {end_label}",
+        f"{else_label}:",
+        *p[12],
+        f"{end_label}:",
+    ]
 
 
 def p_stmt_asm(p):
@@ -1613,6 +1913,23 @@ def p_error(p):
         raise SyntaxError("Syntax error at EOF")
 
 
+# LALR parser, built once per process. PLY caches the tables in
+# parser_spl_tab.py next to this module and reloads them on later runs
+# (they are regenerated automatically whenever the grammar changes).
+_PARSER = None
+
+
+def _get_parser():
+    global _PARSER
+    if _PARSER is None:
+        module = sys.modules.get(__name__)
+        if module is None:
+            import inspect
+            module = inspect.getmodule(inspect.currentframe())
+        _PARSER = yacc.yacc(module=module, tabmodule='parser_spl_tab', debug=False)
+    return _PARSER
+
+
 def compile_high_level(text: str) -> str:
     first_line = None
     for ln in text.splitlines():
@@ -1632,9 +1949,13 @@ def compile_high_level(text: str) -> str:
     pre = _preprocess_indentation(text)
     # Reset type and data section state for this compilation
     type_table.clear()
+    field_index.clear()
     _data_section.clear()
+    _data_pool.clear()
     array_dims.clear()
     array_col_var.clear()
+    _INTERN.clear()
+    _INTERN_IDS.clear()
     
     # Auto-detect dynamic matrix multiplication pattern and set column variables
     # If source contains "var A[" and "var c1", assume A uses c1 for columns
@@ -1648,31 +1969,27 @@ def compile_high_level(text: str) -> str:
     
     lexer = lex_spl.build_lexer()
     ctx = ParserContext()
-    import sys
-    module = sys.modules.get(__name__)
-    if module is None:
-        import inspect
-        module = inspect.getmodule(inspect.currentframe())
-    parser = yacc.yacc(module=module)
+    parser = _get_parser()
     try:
-        result = parser.parse(pre, lexer=lexer)
+        # No position tracking and no debug: PLY runs its leanest loop
+        # (parseopt_notrack), none of the actions read p.lineno/p.lexpos
+        result = parser.parse(pre, lexer=lexer, debug=False, tracking=False)
         # If data section was populated, append it after the generated assembly
         if _data_section:
             data_text = '\n'.join(_data_section) + '\n'
             if result:
                 # Ensure the program ends with an explicit PARA before data
                 # so execution stops and doesn't fall through into data words.
-                last_nonempty = None
-                for ln in reversed(result.splitlines()):
-                    if ln.strip():
-                        last_nonempty = ln.strip()
-                        break
+                # Only the tail of the line list is inspected.
+                last_nonempty = next(
+                    (ln.strip().rsplit('\n', 1)[-1].strip()
+                     for ln in reversed(result) if ln.strip()), None)
                 if last_nonempty is None or last_nonempty.upper() != 'PARA':
-                    result = result + '\nPARA'
-                return result + '\n' + data_text
+                    result.append('PARA')
+                return '\n'.join(result) + '\n' + data_text
             else:
                 return data_text
-        return result
+        return '\n'.join(result)
     finally:
         ctx = None
 
@@ -1704,23 +2021,21 @@ def interpret_high_level(text: str, input_data: list = None):
         # Parsear y ejecutar
         pre = _preprocess_indentation(text)
         type_table.clear()
+        field_index.clear()
         _data_section.clear()
+        _data_pool.clear()
         array_dims.clear()
         array_col_var.clear()
+        _INTERN.clear()
+        _INTERN_IDS.clear()
         module_symbols.clear()
         imported_modules.clear()
         
         lexer = lex_spl.build_lexer()
         ctx = ParserContext()
         
-        import sys
-        module = sys.modules.get(__name__)
-        if module is None:
-            import inspect
-            module = inspect.getmodule(inspect.currentframe())
-        
-        parser = yacc.yacc(module=module)
-        result = parser.parse(pre, lexer=lexer)
+        parser = _get_parser()
+        result = parser.parse(pre, lexer=lexer, debug=False, tracking=False)
         
         # En modo intérprete, result contendrá los ASTs ejecutados
         # El estado final está en interp_ctx
@@ -1732,7 +2047,6 @@ def interpret_high_level(text: str, input_data: list = None):
 
 
 if __name__ == '__main__':
-    import sys
     data = sys.stdin.read()
     
     # Detectar modo: --interpret para interpretar, por defecto compila
@@ -12,20 +12,26 @@ WHILE_RE = re.compile(r"while\s+(.+):")
 IF_RE = re.compile(r"if\s+(.+):")
 COND_NE_RE = re.compile(r"([a-zA-Z_][a-zA-Z0-9_]*)\s*!=\s*([a-zA-Z_][a-zA-Z0-9_]*)")
 COND_GT_RE = re.compile(r"([a-zA-Z_][a-zA-Z0-9_]*)\s*>\s*([a-zA-Z_][a-zA-Z0-9_]*)")
+STRIP_RE = re.compile(r"\s*(?://|;).*$")
+PASSTHROUGH = frozenset(('CARGA', 'GUARD', 'COMP', 'SIPOS', 'SINEG', 'RESTA', 'SALTA', 'PARA'))
 
 
 def compile_euclides(high_text: str) -> str:
-    lines = [ln.split('//')[0].split(';')[0].rstrip() for ln in high_text.splitlines()]
+    lines = [STRIP_RE.sub('', ln).strip() for ln in high_text.splitlines()]
     out = []
     reg_map = {'a': 4, 'b': 5}
 
     i = 0
     while i < len(lines):
-        ln = lines[i].strip()
+        ln = lines[i]
         if not ln:
             i += 1
             continue
-        mload = LOAD_RE.fullmatch(ln)
+        # Dispatch on the first word so each line hits at most the regexes
+        # that could possibly match it
+        head = ln.split(maxsplit=1)[0]
+        has_mem = 'M[' in ln
+        mload = LOAD_RE.fullmatch(ln) if has_mem else None
         if mload:
             var = mload.group(1)
             addr = int(mload.group(2))
@@ -35,7 +41,7 @@ def compile_euclides(high_text: str) -> str:
                 raise ValueError(f"Unknown variable {var} in load")
             i += 1
             continue
-        mwh = WHILE_RE.fullmatch(ln)
+        mwh = WHILE_RE.fullmatch(ln) if head == 'while' else None
         if mwh:
             cond = mwh.group(1).strip()
             mne = COND_NE_RE.fullmatch(cond)
@@ -60,7 +66,7 @@ def compile_euclides(high_text: str) -> str:
             out.append(f"{end_label}:")
             i += 1
             continue
-        mass = ASSIGN_RE.fullmatch(ln)
+        mass = ASSIGN_RE.fullmatch(ln) if has_mem else None
         if mass:
             addr = int(mass.group(1))
             var = mass.group(2)
@@ -71,7 +77,7 @@ def compile_euclides(high_text: str) -> str:
                 continue
             else:
                 raise ValueError('Unsupported assignment to memory from ' + var)
-        if ln.upper().split()[0] in ('CARGA','GUARD','COMP','SIPOS','SINEG','RESTA','SALTA','PARA'):
+        if head.upper() in PASSTHROUGH:
             out.append(ln)
             i += 1
             continue
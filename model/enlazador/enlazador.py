@@ -1,13 +1,17 @@
 import numpy as np
-from bitarray import bitarray
 
 import constants
-from utils import NumberConversion as NC
 from model.procesador import bus
 
 class Enlazador:
     # Código de máquina donde cada línea está separada por un \n
     MACHINE_CODE_RELOC: list[str] = None
+    # Imagen preprocesada: palabras con el hueco {natural} en cero y, para
+    # las líneas relocalizables, su índice, desplazamiento y natural
+    BASE_WORDS: np.ndarray = None
+    RELOC_INDEX: np.ndarray = None
+    RELOC_SHIFT: np.ndarray = None
+    RELOC_NATURAL: np.ndarray = None
 
     @staticmethod
     def set_machine_code(machine_code_reloc: str):
@@ -31,6 +35,55 @@ class Enlazador:
             )
 
         Enlazador.MACHINE_CODE_RELOC = machine_code_reloc_lines
+        parsed = [Enlazador._parse_line(idx, line)
+                  for idx, line in enumerate(machine_code_reloc_lines)]
+        relocs = [(idx, reloc) for idx, (_, reloc) in enumerate(parsed)
+                  if reloc is not None]
+        Enlazador.BASE_WORDS = np.array(
+            [word for word, _ in parsed], dtype=np.uint64)
+        Enlazador.RELOC_INDEX = np.array(
+            [idx for idx, _ in relocs], dtype=np.intp)
+        Enlazador.RELOC_SHIFT = np.array(
+            [reloc[0] for _, reloc in relocs], dtype=np.uint64)
+        Enlazador.RELOC_NATURAL = np.array(
+            [reloc[1] for _, reloc in relocs], dtype=np.uint64)
+
+    @staticmethod
+    def _parse_line(idx: int, code_line: str) -> tuple[int, tuple[int, int] | None]:
+        """
+        Convierte una línea relocalizable en un entero con el hueco de
+        {natural} en cero, junto con el desplazamiento del hueco y el natural.
+        """
+        start = code_line.find('{')
+        end = code_line.find('}')
+        if start < 0 or end < start:
+            if len(code_line) != constants.WORDS_SIZE_BITS:
+                raise ValueError(f"Instrucción {idx} no tiene 64 bits")
+            return int(code_line, 2), None
+
+        natural_str = code_line[start + 1:end]
+        # Verificar que es natural
+        try:
+            natural_val = int(natural_str)
+            if natural_val < 0:
+                raise ValueError()
+        except ValueError:
+            raise ValueError(f"Línea {idx}: "
+                             f"valor no "
+                             f"numérico natural en {{...}}: '{natural_str}'")
+
+        if natural_val >> 24:
+            raise ValueError(f"Instrucción {idx} no tiene 64 bits")
+
+        prefix = code_line[:start]
+        suffix = code_line[end + 1:]
+        # Verificar que la instrucción sea del tamaño de WORD con 24 bits de dirección
+        if len(prefix) + 24 + len(suffix) != constants.WORDS_SIZE_BITS:
+            raise ValueError(f"Instrucción {idx} no tiene 64 bits")
+
+        shift = len(suffix)
+        word_int = (int(prefix or '0', 2) << (24 + shift)) | int(suffix or '0', 2)
+        return word_int, (shift, natural_val)
 
     @staticmethod
     def link_load_machine_code(address: int):
@@ -64,53 +117,20 @@ class Enlazador:
             else:
                 break
 
-        for idx, code_line in enumerate(lines):
-            # Crear conteo de bits para verificar que sea de tamaño WORD
-            bits_count = 0
-            # Contar 0 y 1
-            bits_count += code_line.count('0') + code_line.count('1')
-
-            # Reemplazar {natural} si existe
-            if '{' in code_line and '}' in code_line:
-                # Obtener el número en llaves
-                start = code_line.find('{') + 1
-                end = code_line.find('}')
-                natural_str = code_line[start:end]
-
-                # Verificar que es natural
-                try:
-                    natural_val = int(natural_str)
-                    if natural_val < 0:
-                        raise ValueError()
-                except ValueError:
-                    raise ValueError(f"Línea {idx}: "
-                                     f"valor no "
-                                     f"numérico natural en {{...}}: '{natural_str}'")
-
-                direccion_relocalizada = natural_val + address
-                # 24 bits con ceros a la izquierda
-                direccion_bin: str = (
-                    format(direccion_relocalizada, '024b'))
-
-                # Reemplazar la subcadena completa "{...}" por el binario
-                code_line: str = code_line.replace(
-                    f'{{{natural_str}}}', direccion_bin)
-
-                # Contar bits del nuevo binario insertado
-                bits_count += len(direccion_bin)
-
-                # Verificar que la instrucción sea del tamaño de WORD
-                if bits_count != constants.WORDS_SIZE_BITS:
-                    raise ValueError(f"Instrucción {idx} no tiene 64 bits")
-
-            instruction_bin: bitarray = bitarray(code_line)
-
-            # Cargar la instrucción en memoria
-            target_addr = address + idx
-            bus.DirectionBus.write(NC.natural2bitarray(target_addr, 24))
-            bus.ControlBus.write(bus.ControlBus.WRITE_MEMORY_BIN)
-            bus.DataBus.write(instruction_bin)
-            bus.action()
+        # Relocalizar todas las direcciones a la vez; cada una ocupa 24 bits
+        # en la posición de su {...}
+        image = Enlazador.BASE_WORDS.copy()
+        reloc_index = Enlazador.RELOC_INDEX
+        if len(reloc_index):
+            direcciones = Enlazador.RELOC_NATURAL + np.uint64(address)
+            overflow = np.flatnonzero(direcciones >> np.uint64(24))
+            if len(overflow):
+                raise ValueError(
+                    f"Instrucción {reloc_index[overflow[0]]} no tiene 64 bits")
+            image[reloc_index] |= direcciones << Enlazador.RELOC_SHIFT
+
+        # Cargar toda la imagen en memoria con una sola ráfaga del bus
+        bus.burst_write(address, image)
 
         # Summary print for debugging large images
         # first_nonzero = next((i for i, l in enumerate(lines) if l != zero_word), None)
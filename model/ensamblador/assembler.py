@@ -1,6 +1,8 @@
 """Full assembler moved from tools/ to model/ensamblador with root fix."""
+import io
 import json
 import re
+import sys
 from pathlib import Path
 
 
@@ -26,7 +28,7 @@ def load_tables():
     for length, names in isa.items():
         for idx, name in enumerate(names):
             bits = opcodes[length][idx]
-            table[name.upper()] = (length, idx, bits)
+            table[sys.intern(name.upper())] = (length, idx, bits)
     return table
 
 
@@ -35,16 +37,40 @@ MNEMONIC_TABLE = load_tables()
 reg_re = re.compile(r"R(\d+)", re.IGNORECASE)
 mem_re = re.compile(r"M\[(\d+)\]", re.IGNORECASE)
 ident_re = re.compile(r"[A-Za-z_][A-Za-z0-9_]*$")
+split_re = re.compile(r'[,\s]+')
+
+
+# Formatters and masks for every operand width the encoder emits
+_FMT = {b: ('{:0%db}' % b).format for b in (5, 24, 32, 64)}
+_MASK = {b: (1 << b) - 1 for b in _FMT}
 
 
 def to_nbits(val: int, bits: int) -> str:
-    if val < 0:
-        val = (1 << bits) + val
-    fmt = '{:0' + str(bits) + 'b}'
-    s = fmt.format(val & ((1 << bits) - 1))
-    if len(s) != bits:
-        raise ValueError(f'Value {val} does not fit in {bits} bits')
-    return s
+    # Masking also yields the two's complement encoding of negative values
+    fmt = _FMT.get(bits)
+    if fmt is None:
+        return format(val & ((1 << bits) - 1), f'0{bits}b')
+    return fmt(val & _MASK[bits])
+
+
+def data_word_count(tok: str) -> int:
+    """Number of words a .data operand occupies: `N*V` repeats V N times."""
+    count, star, _ = tok.partition('*')
+    return int(count, 0) if star else 1
+
+
+def data_words(tok: str) -> list:
+    """64-bit words of a .data operand, expanding the `N*V` repeat form."""
+    count, star, val = tok.partition('*')
+    if not star:
+        count, val = '1', tok
+    if val.startswith(('0x','0X')):
+        v = int(val, 16)
+    elif val.startswith(('0b','0B')):
+        v = int(val, 2)
+    else:
+        v = int(val, 0)
+    return [to_nbits(v, 64)] * int(count, 0)
 
 
 def parse_register(tok: str) -> int:
@@ -71,10 +97,17 @@ def assemble_line(parts, table, label_map, relocations, instr_index):
 
     def resolve_token(tok, allow_label=True):
         tok = tok.strip()
-        if reg_re.fullmatch(tok):
-            return ('reg', parse_register(tok))
-        if mem_re.fullmatch(tok):
-            return ('mem', parse_memory(tok))
+        # Only tokens starting with R/M can be registers or memory refs;
+        # keep the match so the number is not parsed a second time
+        head = tok[:1]
+        if head in ('R', 'r'):
+            m = reg_re.fullmatch(tok)
+            if m:
+                return ('reg', int(m.group(1)))
+        elif head in ('M', 'm'):
+            m = mem_re.fullmatch(tok)
+            if m:
+                return ('mem', int(m.group(1)))
         try:
             if tok.startswith(('0x','0X')):
                 return ('imm', int(tok, 16))
@@ -143,11 +176,12 @@ def assemble_line(parts, table, label_map, relocations, instr_index):
 
 
 def assemble_to_object(text: str, out_o_path: str or Path):
-    raw_lines = [raw.split('//')[0].split(';')[0].rstrip() for raw in text.splitlines()]
+    # Pass 1: clean and tokenize every line once, placing labels as we go
+    items = []
     label_map = {}
     instr_count = 0
-    for raw in raw_lines:
-        line = raw.strip()
+    for raw in text.splitlines():
+        line = raw.split('//')[0].split(';')[0].strip()
         if not line:
             continue
         if line.endswith(':'):
@@ -158,39 +192,28 @@ def assemble_to_object(text: str, out_o_path: str or Path):
                 raise ValueError(f'Duplicate label: {lbl}')
             label_map[lbl] = instr_count
             continue
+        parts = [p for p in split_re.split(line) if p]
         if line.startswith('.data'):
-            parts = [p.strip() for p in re.split('[,\s]+', line) if p.strip()]
             data_vals = parts[1:]
-            instr_count += len(data_vals)
+            instr_count += sum(data_word_count(dv) for dv in data_vals)
+            items.append((True, data_vals, line))
             continue
         instr_count += 1
+        items.append((False, parts, line))
 
+    # Pass 2: emit, now that every label is known
     insts = []
     relocations = []
     table = MNEMONIC_TABLE
     idx = 0
-    for raw in raw_lines:
-        line = raw.split('//')[0].split(';')[0].strip()
-        if not line:
-            continue
-        if line.endswith(':'):
-            continue
-        if line.startswith('.data'):
-            parts = [p.strip() for p in re.split('[,\s]+', line) if p.strip()]
-            data_vals = parts[1:]
-            for dv in data_vals:
-                if dv.startswith(('0x','0X')):
-                    v = int(dv, 16)
-                elif dv.startswith(('0b','0B')):
-                    v = int(dv, 2)
-                else:
-                    v = int(dv, 0)
-                b = to_nbits(v, 64)
-                insts.append(b)
-                idx += 1
+    for is_data, parts, line in items:
+        if is_data:
+            for dv in parts:
+                words = data_words(dv)
+                insts.extend(words)
+                idx += len(words)
             continue
 
-        parts = [p.strip() for p in re.split('[,\s]+', line) if p.strip()]
         for i in (1, 2):
             if i < len(parts):
                 tok = parts[i]
@@ -210,21 +233,21 @@ def assemble_to_object(text: str, out_o_path: str or Path):
         if not insts or insts[-1] != para_bits:
             insts.append(para_bits)
 
-    outp = Path(out_o_path)
-    with outp.open('w', encoding='utf-8') as f:
-        f.write('ENTRY: main\n')
-        f.write(f'SEGMENT: CODE,SIZE={len(insts)},BASE=0\n')
-        f.write('SEGMENT: DATA, SIZE=0, BASE=0\n')
-        for name, addr in label_map.items():
-            f.write(f'SYM: {name},{addr},local\n')
-        for inst in insts:
-            f.write(f'INST: {inst}\n')
-        for instr_idx, sym in relocations:
-            f.write(f'RELOC: {instr_idx}, TYPE=ABS, SYMBOL={sym}\n')
+    # Build the object text in memory and write the file in one call
+    buf = io.StringIO()
+    buf.write('ENTRY: main\n')
+    buf.write(f'SEGMENT: CODE,SIZE={len(insts)},BASE=0\n')
+    buf.write('SEGMENT: DATA, SIZE=0, BASE=0\n')
+    for name, addr in label_map.items():
+        buf.write(f'SYM: {name},{addr},local\n')
+    for inst in insts:
+        buf.write(f'INST: {inst}\n')
+    for instr_idx, sym in relocations:
+        buf.write(f'RELOC: {instr_idx}, TYPE=ABS, SYMBOL={sym}\n')
+    Path(out_o_path).write_text(buf.getvalue(), encoding='utf-8')
 
 
 if __name__ == '__main__':
-    import sys
     txt = sys.stdin.read()
     out = Path('out.o')
     assemble_to_object(txt, out)
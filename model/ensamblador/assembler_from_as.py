@@ -3,6 +3,7 @@ Moved from tools/ to model/ensamblador; updated repo root detection.
 """
 import json
 import re
+import sys
 from pathlib import Path
 
 
@@ -28,7 +29,7 @@ def load_tables():
     for length, names in isa.items():
         for idx, name in enumerate(names):
             bits = opcodes[length][idx]
-            table[name.upper()] = (length, idx, bits)
+            table[sys.intern(name.upper())] = (length, idx, bits)
     return table
 
 
@@ -38,14 +39,37 @@ reg_re = re.compile(r"R(\d+)", re.IGNORECASE)
 mem_re = re.compile(r"M\[(\d+)\]", re.IGNORECASE)
 
 
+# Formatters and masks for every operand width the encoder emits
+_FMT = {b: ('{:0%db}' % b).format for b in (5, 24, 32, 64)}
+_MASK = {b: (1 << b) - 1 for b in _FMT}
+
+
 def to_nbits(val: int, bits: int) -> str:
-    if val < 0:
-        val = (1 << bits) + val
-    fmt = '{:0' + str(bits) + 'b}'
-    s = fmt.format(val & ((1 << bits) - 1))
-    if len(s) != bits:
-        raise ValueError(f'Value {val} does not fit in {bits} bits')
-    return s
+    # Masking also yields the two's complement encoding of negative values
+    fmt = _FMT.get(bits)
+    if fmt is None:
+        return format(val & ((1 << bits) - 1), f'0{bits}b')
+    return fmt(val & _MASK[bits])
+
+
+def data_word_count(tok: str) -> int:
+    """Number of words a .data operand occupies: `N*V` repeats V N times."""
+    count, star, _ = tok.partition('*')
+    return int(count, 0) if star else 1
+
+
+def data_words(tok: str) -> list:
+    """64-bit words of a .data operand, expanding the `N*V` repeat form."""
+    count, star, val = tok.partition('*')
+    if not star:
+        count, val = '1', tok
+    if val.startswith(('0x','0X')):
+        v = int(val, 16)
+    elif val.startswith(('0b','0B')):
+        v = int(val, 2)
+    else:
+        v = int(val, 0)
+    return [to_nbits(v, 64)] * int(count, 0)
 
 
 def parse_register(tok: str) -> int:
@@ -157,7 +181,7 @@ def assemble_text(text: str) -> list:
         if line.startswith('.data'):
             parts = [p.strip() for p in re.split('[,\s]+', line) if p.strip()]
             data_vals = parts[1:]
-            instr_count += len(data_vals)
+            instr_count += sum(data_word_count(dv) for dv in data_vals)
             continue
         instr_count += 1
 
@@ -174,14 +198,7 @@ def assemble_text(text: str) -> list:
             parts = [p.strip() for p in re.split('[,\s]+', line) if p.strip()]
             data_vals = parts[1:]
             for dv in data_vals:
-                if dv.startswith(('0x','0X')):
-                    v = int(dv, 16)
-                elif dv.startswith(('0b','0B')):
-                    v = int(dv, 2)
-                else:
-                    v = int(dv, 0)
-                b = to_nbits(v, 64)
-                lines.append(b)
+                lines.extend(data_words(dv))
             continue
 
         def replace_mem_label(match):
@@ -268,7 +285,6 @@ def ensure_para(lines: list) -> list:
 
 
 if __name__ == '__main__':
-    import sys
     txt = sys.stdin.read()
     basename = None
     if len(sys.argv) > 1:
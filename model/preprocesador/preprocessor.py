@@ -10,6 +10,11 @@ from pathlib import Path
 from typing import Dict, Set
 
 
+_DEFINE_RE = re.compile(r'#define\s+(\w+)\s+(.*)')
+_INCLUDE_QUOTED_RE = re.compile(r'#include\s+"([^"]+)"')
+_INCLUDE_ANGLED_RE = re.compile(r'#include\s+<([^>]+)>')
+
+
 class PreprocessorError(Exception):
     """Error durante el preprocesamiento"""
     pass
@@ -27,6 +32,8 @@ def preprocess(source_text: str, source_file: Path = None) -> str:
         El texto preprocesado con todas las macros expandidas e includes insertados
     """
     defines: Dict[str, str] = {}
+    # Patrón compilado (con word boundaries) de cada macro, se compila una sola vez
+    define_patterns: Dict[str, re.Pattern] = {}
     included_files: Set[Path] = set()
     
     if source_file:
@@ -45,11 +52,14 @@ def preprocess(source_text: str, source_file: Path = None) -> str:
             
             # Procesar #define
             if stripped.startswith('#define'):
-                match = re.match(r'#define\s+(\w+)\s+(.*)', stripped)
+                match = _DEFINE_RE.match(stripped)
                 if match:
                     macro_name = match.group(1)
                     macro_value = match.group(2).strip()
                     defines[macro_name] = macro_value
+                    if macro_name not in define_patterns:
+                        define_patterns[macro_name] = re.compile(
+                            r'\b' + re.escape(macro_name) + r'\b')
                     # Agregar línea comentada para traceabilidad
                     result_lines.append(f'# #define {macro_name} {macro_value}')
                 else:
@@ -60,9 +70,9 @@ def preprocess(source_text: str, source_file: Path = None) -> str:
             
             # Procesar #include
             if stripped.startswith('#include'):
-                match = re.match(r'#include\s+"([^"]+)"', stripped)
+                match = _INCLUDE_QUOTED_RE.match(stripped)
                 if not match:
-                    match = re.match(r'#include\s+<([^>]+)>', stripped)
+                    match = _INCLUDE_ANGLED_RE.match(stripped)
                 
                 if match:
                     include_filename = match.group(1)
@@ -117,8 +127,7 @@ def preprocess(source_text: str, source_file: Path = None) -> str:
             for macro_name, macro_value in defines.items():
                 # Usar word boundaries para evitar reemplazos parciales
                 # Por ejemplo, NUM1 no debe reemplazarse en NUM10
-                pattern = r'\b' + re.escape(macro_name) + r'\b'
-                expanded_line = re.sub(pattern, macro_value, expanded_line)
+                expanded_line = define_patterns[macro_name].sub(macro_value, expanded_line)
             
             result_lines.append(expanded_line)
         
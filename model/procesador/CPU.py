@@ -2,6 +2,7 @@ import inspect
 import numpy as np
 from typing import Callable
 from bitarray import bitarray
+from bitarray.util import ba2int
 
 import utils
 import constants
@@ -116,6 +117,10 @@ class ALU:
     N: int = 2
     D: int = 3
     registers: np.ndarray[bitarray] = None
+    # Versión de cada registro, se incrementa en cada escritura (permite cachear lecturas)
+    _reg_version: list[int] = [0] * 32
+    # Copia de los 32 registros como uint64 (permite leer rangos de forma vectorizada)
+    _regs_u64: np.ndarray = np.zeros(32, dtype=np.uint64)
 
     @staticmethod
     def set_up():
@@ -127,10 +132,12 @@ class ALU:
         """
         # 32 registros donde cada uno es un objeto
         ALU.registers = np.empty(32, dtype=object)
+        ALU._regs_u64[:] = 0
         for i in range(32):
             # Cada objeto apunta a un bitarray de 64 bits
             ALU.registers[i] = bitarray(
                 '0' * constants.WORDS_SIZE_BITS, endian='big')
+            ALU._reg_version[i] += 1
 
         # Inicializamos la pila (SP) en la última dirección de memoria disponible, puesto que esta crece hacía abajo, cada vez que se apila se decrementa el SP y se agrega el valor en la nueva dirección a la que apunta.
         ALU.write_register(ALU.SP, NC.natural2bitarray(
@@ -203,6 +210,8 @@ class ALU:
                 f"El valor debe tener {constants.WORDS_SIZE_BITS} bits.")
 
         ALU.registers[register_id] = value.copy()
+        ALU._reg_version[register_id] += 1
+        ALU._regs_u64[register_id] = NC.bitarray2natural(value)
 
     @staticmethod
     def modify_state_int(value: int) -> None:
@@ -310,6 +319,33 @@ class CU:
     instruction_asm: str = None
     instruction_args: list[bitarray] = None
 
+    # Orden de búsqueda de longitudes de opcode (de mayor a menor para evitar
+    # colisiones de prefijos, p. ej. APILA (59) empieza con el prefijo de CARGAIND (54))
+    _OPCODE_LENGTHS: tuple = ('64', '59', '54', '40', '35', '27')
+    # [(longitud, desplazamiento, {opcode (int): offset})], se construye una
+    # sola vez a partir de opcodes.json
+    _opcode_table: list[tuple[str, int, dict[int, int]]] = None
+    _isa_table: dict = None
+
+    @staticmethod
+    def _load_tables() -> None:
+        """
+        Carga opcodes.json e ISA.json y construye la tabla de búsqueda de
+        opcodes agrupada por longitud.
+        """
+        opcodes_dict = utils.FileManager.JSON.JSON2dict(constants.OPCODES_PATH)
+        table = []
+        for length_i in CU._OPCODE_LENGTHS:
+            if length_i not in opcodes_dict:
+                continue
+            by_opcode: dict[int, int] = {}
+            for idx, opcode in enumerate(opcodes_dict[length_i]):
+                by_opcode.setdefault(int(opcode, 2), idx)
+            shift = constants.WORDS_SIZE_BITS - int(length_i)
+            table.append((length_i, shift, by_opcode))
+        CU._isa_table = utils.FileManager.JSON.JSON2dict(constants.ISA_PATH)
+        CU._opcode_table = table
+
     @staticmethod
     def decode(word_binary: bitarray) -> None:
         """
@@ -323,24 +359,19 @@ class CU:
         CU.instruction_word = word_binary
 
         # Encontrar de qué tipo es la instrucción y cuál es su opcode.
-        opcodes_dict = utils.FileManager.JSON.JSON2dict(constants.OPCODES_PATH)
+        if CU._opcode_table is None:
+            CU._load_tables()
         length, offset = None, None
-        # Convertir a string la cadena de bits
-        instr_str = str(CU.instruction_word.to01())
+        # Palabra como entero: el opcode de cada longitud se obtiene con un desplazamiento
+        instr_int: int = ba2int(CU.instruction_word)
 
-        # Check lengths in descending order to avoid prefix collisions
-        # (e.g., APILA's 59-bit opcode starts with CARGAIND's 54-bit prefix)
-        for length_i in ['64', '59', '54', '40', '35', '27']:
-            if length_i not in opcodes_dict:
-                continue
-            opcodes_list = opcodes_dict[length_i]
-            for idx, opcode in enumerate(opcodes_list):
-                if instr_str.startswith(opcode):
-                    length = length_i
-                    offset = idx
-                    break
-            if length is not None:
-                break  # Salir del ciclo exterior si ya se encontró
+        # Una búsqueda en diccionario por cada longitud posible
+        for length_i, shift, by_opcode in CU._opcode_table:
+            idx = by_opcode.get(instr_int >> shift)
+            if idx is not None:
+                length = length_i
+                offset = idx
+                break
 
         if length is None:
             raise ValueError(
@@ -350,9 +381,7 @@ class CU:
         CU.opcode_offset = offset
 
         # Obtener la instrucción exacta
-        instr_asm_dict: dict = utils.FileManager.JSON.JSON2dict(
-            constants.ISA_PATH)
-        CU.instruction_asm = instr_asm_dict[CU.opcode_length][CU.opcode_offset]
+        CU.instruction_asm = CU._isa_table[CU.opcode_length][CU.opcode_offset]
 
         # Extract args depending on length type
         CU.instruction_args = []
@@ -2,8 +2,10 @@ from typing import Callable
 
 import numpy as np
 from bitarray import bitarray
+from bitarray.util import int2ba
 
 import constants
+from controller import terminal as _term
 from model.procesador.memory import Memory
 from utils import NumberConversion as NC
 
@@ -20,6 +22,21 @@ def action():
     call_instruccion(instruction[constants.CONTROL_SIZE-1])
 
 
+def burst_write(address: int, words: np.ndarray) -> None:
+    """
+    Escribe un array np.uint64 de palabras en memoria a partir de `address`
+    como una sola ráfaga, en lugar de un ciclo de bus por palabra.
+    Los buses quedan con la última dirección y palabra escritas.
+    """
+    if not len(words):
+        return
+    Memory.write_block(address, words)
+
+    DirectionBus.write(NC.natural2bitarray(address + len(words) - 1, constants.MEMORY_BITS))
+    ControlBus.write(ControlBus.WRITE_MEMORY_BIN)
+    DataBus.write(int2ba(int(words[-1]), length=constants.WORDS_SIZE_BITS, endian='big'))
+
+
 def call_instruccion(instr: int):
     c_operations: dict[int, Callable[[], None]] = {
         ControlBus.READ_MEMORY: ControlBus.Instructions.read_memory,
@@ -145,7 +162,6 @@ class ControlBus:
             addr = NC.bitarray2natural(DirectionBus.read())
             # If reading from E/S and no input available, signal that input is needed
             try:
-                from controller import terminal as _term
                 if constants.E_S_RANGE[0] <= addr <= constants.E_S_RANGE[1] and not _term.has_input():
                     raise _term.InputNeeded()
             except Exception as e:
@@ -2,6 +2,9 @@
 import constants
 import numpy as np
 
+from controller import terminal as _term
+
+
 class Memory:
     """
     Clase que representa la memoria del procesador.
@@ -35,7 +38,6 @@ class Memory:
 
         # If reading from E/S range and GUI provided input, serve it first
         try:
-            from controller import terminal as _term
             if constants.E_S_RANGE[0] <= direction <= constants.E_S_RANGE[1]:
                 if _term.has_input():
                     v = _term.pop_input_uint64()
@@ -61,9 +63,36 @@ class Memory:
             Memory.memory_changed.append(direction)
         # If writing to E/S range, notify terminal (GUI)
         try:
-            from controller import terminal as _term
             if constants.E_S_RANGE[0] <= direction <= constants.E_S_RANGE[1]:
                 # decode uint64 to int and notify
                 _term.write_notify(direction, int(value))
         except Exception:
             pass
+
+    @staticmethod
+    def write_block(direction: int, values: np.ndarray):
+        """
+        Escribe un bloque contiguo de palabras a partir de una dirección
+        con una sola asignación sobre el array de memoria.
+        :param direction: Dirección de la primera palabra.
+        :param values: Array np.uint64 con las palabras a escribir.
+        """
+        end = direction + len(values)
+        if not (0 <= direction and end <= constants.MEMORY_SIZE):
+            raise ValueError("Dirección de memoria fuera de rango.")
+
+        if values.dtype != np.uint64:
+            raise TypeError("Los valores deben ser de tipo np.uint64.")
+
+        Memory.array[direction:end] = values
+        changed = Memory.memory_changed
+        already = set(changed)
+        changed.extend(d for d in range(direction, end) if d not in already)
+        # Notify terminal (GUI) for any word that falls in the E/S range
+        lo = max(direction, constants.E_S_RANGE[0])
+        hi = min(end - 1, constants.E_S_RANGE[1])
+        try:
+            for d in range(lo, hi + 1):
+                _term.write_notify(d, int(Memory.array[d]))
+        except Exception:
+            pass
@@ -822,12 +822,14 @@ class VentanaEjecucion(tk.Toplevel):
         try:
             # Importar y usar el intérprete
             from model.compilador.parser_spl import interpret_high_level
+            from model.compilador.interpreter_yacc import release_interpreter
             
             # Ejecutar en modo intérprete
             ctx = interpret_high_level(src)
             
-            # Mostrar resultados
+            # Mostrar resultados; después el contexto puede reutilizarse
             self._mostrar_resultados(ctx)
+            release_interpreter(ctx)
             
         except Exception as e:
             tk.messagebox.showerror("Error al ejecutar", f"{e}")
@@ -852,9 +854,9 @@ class VentanaEjecucion(tk.Toplevel):
         if ctx.objects:
             self.txt_objetos.insert(tk.END, "Objeto\t\tCampos\n")
             self.txt_objetos.insert(tk.END, "="*40 + "\n")
-            for name, fields in ctx.objects.items():
+            for name in ctx.objects:
                 self.txt_objetos.insert(tk.END, f"{name}:\n")
-                for field_name, field_value in fields.items():
+                for field_name, field_value in ctx.object_fields(name).items():
                     self.txt_objetos.insert(tk.END, f"  .{field_name} = {field_value}\n")
         else:
             self.txt_objetos.insert(tk.END, "(Sin objetos)")